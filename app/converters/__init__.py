@@ -1,20 +1,32 @@
 # Converter Modules Package
 # Universal Converter v2.0
 
-from .images import convert_image
+from .images import convert_image, convert_image_multi
 from .video import convert_media
 from .docs import convert_doc
-from .pdf import convert_pdf
+from .pdf import convert_pdf, stream_pdf_text, render_pdf_page, PDF_TEXT_FORMATS, PAGE_MEDIA_TYPES
 from .docx_converter import convert_docx
 from .pptx_converter import convert_pptx
 from .archive import convert_archive
+from .office import convert_office_batch
+from .planner import convert_planned, has_edge, source_format, clear_plan_cache
 
 __all__ = [
     'convert_image',
+    'convert_image_multi',
     'convert_media', 
     'convert_doc',
     'convert_pdf',
+    'stream_pdf_text',
+    'PDF_TEXT_FORMATS',
+    'render_pdf_page',
+    'PAGE_MEDIA_TYPES',
     'convert_docx',
     'convert_pptx',
-    'convert_archive'
+    'convert_archive',
+    'convert_office_batch',
+    'convert_planned',
+    'has_edge',
+    'source_format',
+    'clear_plan_cache'
 ]
@@ -1,19 +1,72 @@
 """
 Data Converter - Enhanced Version
-Converts data files between CSV, XLSX, JSON, XML, HTML, TXT formats using Pandas.
+Converts data files between CSV, XLSX, JSON, XML, HTML, TXT, Parquet and Feather formats using Pandas.
 """
 import os
+import csv
+import html
+import json
+import codecs
 import pandas as pd
 import asyncio
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from lxml import etree
 
+# Optional fast incremental JSON parser (yajl); the stdlib reader below is used otherwise
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
 
-async def convert_doc(input_path: str, output_dir: str, target_format: str) -> dict:
-    """Data file converter supporting CSV, XLSX, JSON, XML, HTML, TXT."""
+# Optional Arrow engine (multithreaded CSV parsing, Parquet/Feather)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as pa_feather
+    import pyarrow.parquet as pa_parquet
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+# CSV/TXT inputs at least this large are converted chunk by chunk
+STREAM_THRESHOLD = int(os.environ.get("UC_DATA_STREAM_MB", "64")) * 1024 * 1024
+CHUNK_ROWS = int(os.environ.get("UC_DATA_CHUNK_ROWS", "50000"))
+STREAM_TARGETS = ['csv', 'txt', 'json', 'jsonl', 'xml', 'xlsx', 'html']
+ARROW_FORMATS = ['parquet', 'feather']
+PARQUET_COMPRESSION = 'zstd'
+
+# Text sniffing: bounded prefix, candidate encodings (Turkish Windows before latin-1) and delimiters
+SNIFF_BYTES = 64 * 1024
+TEXT_ENCODINGS = ['utf-8', 'cp1254', 'latin-1']
+SNIFF_DELIMITERS = ',\t;|'
+
+# Incremental JSON reader block size
+JSON_READ_SIZE = 1024 * 1024
+
+# Opt-in: split HTML tables into linked pages of this many rows with an index page (0 = one file)
+HTML_PAGE_ROWS = int(os.environ.get("UC_HTML_PAGE_ROWS", "0"))
+
+# Excel's hard sheet limit (header included); larger outputs continue on a new sheet
+EXCEL_MAX_ROWS = 1_048_576
+
+
+async def convert_doc(input_path: str, output_dir: str, target_format: str, sheet: str = None,
+                      record_path: str = None) -> dict:
+    """
+    Data file converter supporting CSV, XLSX, JSON, XML, HTML, TXT, Parquet, Feather.
+    ``sheet`` picks one workbook sheet by name or 1-based index; otherwise every sheet is converted.
+    ``record_path`` locates the repeated records in JSON ("data.items") or XML ("catalog/book").
+    """
     loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, _process_data, input_path, output_dir, target_format)
+    return await loop.run_in_executor(None, _process_data, input_path, output_dir, target_format, sheet,
+                                      record_path)
 
 
-def _process_data(input_path: str, output_dir: str, target_format: str) -> dict:
+def _process_data(input_path: str, output_dir: str, target_format: str, sheet: str = None,
+                  record_path: str = None) -> dict:
     try:
         filename = os.path.basename(input_path)
         name, ext = os.path.splitext(filename)
@@ -21,21 +74,52 @@ def _process_data(input_path: str, output_dir: str, target_format: str) -> dict:
         output_filename = f"{name}.{target_format}"
         output_path = os.path.join(output_dir, output_filename)
 
+        if (ext in ['.parquet', '.feather'] or target_format in ARROW_FORMATS) and not HAS_ARROW:
+            return {"success": False, "error": "Parquet/Feather support requires pyarrow (pip install pyarrow)"}
+
+        # Delimited text to a columnar format never goes through pandas
+        if ext in ['.csv', '.txt'] and target_format in ARROW_FORMATS:
+            return _csv_to_arrow(input_path, output_path, output_filename, ext, target_format)
+
+        # Workbooks are read sheet by sheet in read-only mode
+        if ext in ['.xlsx', '.xls']:
+            return _convert_workbook(input_path, output_dir, name, ext, target_format, sheet)
+
+        # Nested JSON/XML is parsed record by record when a path is given or the file is large
+        if ext in ['.json', '.jsonl', '.xml'] and (record_path or os.path.getsize(input_path) >= STREAM_THRESHOLD):
+            if ext == '.xml':
+                records = _xml_records(input_path, record_path)
+            else:
+                records = _json_records(input_path, ext, record_path)
+            return _write_output(_record_chunks(records), output_path, output_filename, target_format, name)
+
+        # Large delimited text never needs the whole table in memory; columnar inputs are read batch by batch
+        if target_format in STREAM_TARGETS:
+            if ext in ['.csv', '.txt'] and os.path.getsize(input_path) >= STREAM_THRESHOLD:
+                return _write_output(_text_chunks(input_path, ext), output_path, output_filename, target_format, name)
+            if ext in ['.parquet', '.feather']:
+                return _write_output(_arrow_chunks(input_path, ext), output_path, output_filename, target_format,
+                                     name)
+
         # === READ INPUT ===
         df = None
         
-        if ext == '.csv':
-            df = pd.read_csv(input_path, encoding='utf-8')
-        elif ext in ['.xlsx', '.xls']:
-            df = pd.read_excel(input_path)
+        if ext in ['.csv', '.txt']:
+            df = _read_text_table(input_path, ext)
         elif ext == '.json':
             # Try different JSON formats
             try:
                 df = pd.read_json(input_path)
             except:
                 df = pd.read_json(input_path, lines=True)
+        elif ext == '.jsonl':
+            df = pd.read_json(input_path, lines=True)
         elif ext == '.xml':
             df = pd.read_xml(input_path)
+        elif ext == '.parquet':
+            df = pd.read_parquet(input_path)
+        elif ext == '.feather':
+            df = pd.read_feather(input_path)
         elif ext == '.html':
             # Read first table from HTML
             tables = pd.read_html(input_path)
@@ -43,44 +127,683 @@ def _process_data(input_path: str, output_dir: str, target_format: str) -> dict:
                 df = tables[0]
             else:
                 return {"success": False, "error": "No tables found in HTML file"}
-        elif ext == '.txt':
-            # Try tab-separated first, then comma
-            try:
-                df = pd.read_csv(input_path, sep='\t', encoding='utf-8')
-            except:
-                try:
-                    df = pd.read_csv(input_path, encoding='utf-8')
-                except:
-                    # Plain text - read as single column
-                    with open(input_path, 'r', encoding='utf-8') as f:
-                        lines = f.readlines()
-                    df = pd.DataFrame({'content': [line.strip() for line in lines if line.strip()]})
         else:
             return {"success": False, "error": f"Unsupported source format: {ext}"}
 
         if df is None or df.empty:
             return {"success": False, "error": "Could not read data from file"}
 
-        # === WRITE OUTPUT ===
-        if target_format == 'csv':
-            df.to_csv(output_path, index=False, encoding='utf-8')
-            
-        elif target_format == 'xlsx':
-            df.to_excel(output_path, index=False, engine='openpyxl')
-            
-        elif target_format == 'json':
-            df.to_json(output_path, orient='records', indent=2, force_ascii=False)
-            
-        elif target_format == 'xml':
-            df.to_xml(output_path, index=False, root_name='data', row_name='record')
-            
-        elif target_format == 'html':
-            html_content = f"""<!DOCTYPE html>
+        return _write_frame(df, output_path, output_filename, target_format, name)
+
+    except Exception as e:
+        return {"success": False, "error": f"Data conversion error: {str(e)}"}
+
+
+def _write_frame(df: pd.DataFrame, output_path: str, output_filename: str, target_format: str, name: str) -> dict:
+    """Write a complete DataFrame in target_format."""
+    if target_format == 'html':
+        return _write_html([df], output_path, output_filename, name)
+
+    elif target_format in STREAM_TARGETS:
+        # Same serializer as the streamed path, so the output does not depend on the input size
+        _write_chunks([df], output_path, target_format, set())
+
+    elif target_format == 'parquet':
+        df.to_parquet(output_path, index=False, compression=PARQUET_COMPRESSION)
+
+    elif target_format == 'feather':
+        df.reset_index(drop=True).to_feather(output_path)
+        
+    else:
+        return {"success": False, "error": f"Unsupported target format: {target_format}"}
+
+    return {"success": True, "output_path": output_path, "filename": output_filename}
+
+
+def _sniff_text(input_path: str, ext: str) -> dict:
+    """
+    Detect encoding, delimiter, quoting and header from the first SNIFF_BYTES of a text file.
+    ``sep`` is None for plain (non-tabular) text.
+    """
+    with open(input_path, 'rb') as f:
+        sample = f.read(SNIFF_BYTES)
+    final = len(sample) < SNIFF_BYTES
+
+    if sample.startswith(codecs.BOM_UTF8):
+        candidates = ['utf-8-sig']
+    elif sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        candidates = ['utf-16']
+    else:
+        candidates = TEXT_ENCODINGS
+    for encoding in candidates:
+        try:
+            # Incremental decoding tolerates a multi-byte character cut at the prefix end
+            text = codecs.getincrementaldecoder(encoding)().decode(sample, final=final)
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        # A BOM followed by invalid bytes: keep the BOM's encoding and replace the bad bytes,
+        # as the readers do with encoding_errors='replace'
+        encoding = candidates[0]
+        text = codecs.getincrementaldecoder(encoding)(errors='replace').decode(sample, final=final)
+    if not final and '\n' in text:
+        text = text[:text.rindex('\n') + 1]
+
+    sniffer = csv.Sniffer()
+    try:
+        dialect = sniffer.sniff(text, delimiters=SNIFF_DELIMITERS)
+    except csv.Error:
+        # A one-column CSV is still a table; a .txt without delimiters is plain text
+        if ext == '.csv':
+            return {"encoding": encoding, "sep": ',', "quotechar": '"', "header": True}
+        return {"encoding": encoding, "sep": None}
+
+    # has_header() gives up on string-only columns, so only trust a "no" for rows with numbers in them
+    first_row = next(csv.reader([text.split('\n', 1)[0]], dialect), [])
+    try:
+        header = sniffer.has_header(text) or not any(_is_number(field) for field in first_row)
+    except csv.Error:
+        header = True
+
+    return {"encoding": encoding, "sep": dialect.delimiter, "quotechar": dialect.quotechar or '"', "header": header}
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _csv_options(sniffed: dict) -> dict:
+    return {
+        "sep": sniffed["sep"],
+        "quotechar": sniffed["quotechar"],
+        "header": 0 if sniffed["header"] else None,
+        "encoding": sniffed["encoding"],
+    }
+
+
+def _name_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Headerless tables get column_1..N instead of integer labels (invalid in XML, Parquet, Excel)."""
+    df.columns = [f"column_{i + 1}" for i in range(len(df.columns))]
+    return df
+
+
+def _read_text_table(input_path: str, ext: str) -> pd.DataFrame:
+    """Sniff once, then parse once: CSV/TSV via _read_csv, plain text as a single 'content' column."""
+    sniffed = _sniff_text(input_path, ext)
+    if sniffed["sep"] is None:
+        with open(input_path, 'r', encoding=sniffed["encoding"], errors='replace') as f:
+            return pd.DataFrame({'content': [line.strip() for line in f if line.strip()]})
+
+    df = _read_csv(input_path, sniffed)
+    return df if sniffed["header"] else _name_columns(df)
+
+
+def _read_csv(input_path: str, sniffed: dict) -> pd.DataFrame:
+    """Read a CSV with the multithreaded Arrow parser when available; columns keep NumPy dtypes."""
+    if HAS_ARROW:
+        try:
+            read_options, parse_options = _arrow_csv_options(sniffed)
+            # Arrow infers dates, times and timestamps; the C parser keeps them as the original text
+            schema = _first_block_schema(input_path, read_options, parse_options)
+            if len(set(schema.names)) == len(schema.names):
+                convert_options = pa_csv.ConvertOptions(
+                    column_types={field.name: pa.string() for field in schema if pa.types.is_temporal(field.type)},
+                    strings_can_be_null=True
+                )
+                table = pa_csv.read_csv(input_path, read_options=read_options, parse_options=parse_options,
+                                        convert_options=convert_options)
+                # All-empty columns come back untyped; the C parser reads them as float NaN
+                for index, field in enumerate(table.schema):
+                    if pa.types.is_null(field.type):
+                        table = table.set_column(index, field.name, table.column(index).cast(pa.float64()))
+                return table.to_pandas()
+        except Exception:
+            # The Arrow parser is stricter (ragged rows, stray quotes, bytes outside the sniffed prefix)
+            pass
+    # Duplicate header names are only mangled ("a", "a.1") by the pandas reader
+    return pd.read_csv(input_path, encoding_errors='replace', **_csv_options(sniffed))
+
+
+def _arrow_csv_options(sniffed: dict) -> tuple:
+    read_options = pa_csv.ReadOptions(encoding=sniffed["encoding"], autogenerate_column_names=not sniffed["header"])
+    parse_options = pa_csv.ParseOptions(delimiter=sniffed["sep"], quote_char=sniffed["quotechar"])
+    return read_options, parse_options
+
+
+def _first_block_schema(input_path: str, read_options, parse_options):
+    """
+    Schema Arrow infers for a CSV. Types are inferred from the first block only, so a streaming
+    reader, which parses just that block on open, gives the same answer as a full read.
+    """
+    with pa_csv.open_csv(input_path, read_options=read_options, parse_options=parse_options) as reader:
+        return reader.schema
+
+
+def _text_chunks(input_path: str, ext: str):
+    """Yield DataFrames of up to CHUNK_ROWS rows from a CSV/TSV or plain text file."""
+    sniffed = _sniff_text(input_path, ext)
+    if sniffed["sep"] is None:
+        with open(input_path, 'r', encoding=sniffed["encoding"], errors='replace') as f:
+            lines = []
+            for line in f:
+                if line.strip():
+                    lines.append(line.strip())
+                if len(lines) == CHUNK_ROWS:
+                    yield pd.DataFrame({'content': lines})
+                    lines = []
+            if lines:
+                yield pd.DataFrame({'content': lines})
+        return
+
+    chunks = pd.read_csv(input_path, encoding_errors='replace', chunksize=CHUNK_ROWS, **_csv_options(sniffed))
+    for chunk in chunks:
+        yield chunk if sniffed["header"] else _name_columns(chunk)
+
+
+def _arrow_chunks(input_path: str, ext: str):
+    """Yield DataFrames of up to CHUNK_ROWS rows from a Parquet or Feather file."""
+    if ext == '.parquet':
+        batches = pa_parquet.ParquetFile(input_path).iter_batches(batch_size=CHUNK_ROWS)
+        for batch in batches:
+            yield batch.to_pandas()
+    else:
+        # Feather v2 is the Arrow IPC file format; memory-mapped, batches are zero-copy
+        with pa.memory_map(input_path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                table = pa.Table.from_batches([reader.get_batch(i)])
+                for batch in table.to_batches(max_chunksize=CHUNK_ROWS):
+                    yield batch.to_pandas()
+
+
+def _csv_to_arrow(input_path: str, output_path: str, output_filename: str, ext: str, target_format: str) -> dict:
+    """CSV/TXT to Parquet/Feather with pyarrow's multithreaded reader; no pandas round trip."""
+    sniffed = _sniff_text(input_path, ext)
+    if sniffed["sep"] is None:
+        table = pa.Table.from_pandas(_read_text_table(input_path, ext), preserve_index=False)
+    else:
+        try:
+            read_options, parse_options = _arrow_csv_options(sniffed)
+            table = pa_csv.read_csv(input_path, read_options=read_options, parse_options=parse_options)
+            if not sniffed["header"]:
+                table = table.rename_columns([f"column_{i + 1}" for i in range(table.num_columns)])
+        except (pa.ArrowInvalid, UnicodeDecodeError):
+            # Ragged rows or bytes the sniffed encoding can't decode: the pandas reader is more lenient
+            table = pa.Table.from_pandas(_read_text_table(input_path, ext), preserve_index=False)
+
+    if table.num_rows == 0:
+        return {"success": False, "error": "Could not read data from file"}
+
+    if target_format == 'parquet':
+        pa_parquet.write_table(table, output_path, compression=PARQUET_COMPRESSION)
+    else:
+        pa_feather.write_feather(table, output_path)
+
+    return {"success": True, "output_path": output_path, "filename": output_filename}
+
+
+
+def _convert_workbook(input_path: str, output_dir: str, name: str, ext: str, target_format: str,
+                      sheet: str = None) -> dict:
+    """
+    Convert XLSX/XLS sheets. XLSX is read in openpyxl read-only mode, CHUNK_ROWS rows at a time.
+    An XLSX target keeps every sheet in one workbook; other targets get one file per sheet.
+    """
+    workbook = None
+    if ext == '.xlsx':
+        workbook = load_workbook(input_path, read_only=True, data_only=True)
+        sheets = [(ws.title, ws) for ws in workbook.worksheets]
+    else:
+        # xlrd has no streaming mode; legacy .xls files are small enough to load
+        sheets = list(pd.read_excel(input_path, sheet_name=None).items())
+
+    try:
+        if sheet:
+            sheets = [_select_sheet(sheets, sheet)]
+
+        def chunks(source):
+            return _sheet_chunks(source) if workbook else [source]
+
+        if target_format == 'xlsx':
+            output_filename = f"{name}.xlsx"
+            output_path = os.path.join(output_dir, output_filename)
+            if not _write_xlsx([(title, chunks(source)) for title, source in sheets], output_path):
+                os.remove(output_path)
+                return {"success": False, "error": "Could not read data from file"}
+            return {"success": True, "output_path": output_path, "filename": output_filename}
+
+        output_files = []
+        for title, source in sheets:
+            suffix = '' if len(sheets) == 1 else '_' + "".join(c if c.isalnum() else '_' for c in title)
+            output_filename = f"{name}{suffix}.{target_format}"
+            output_path = os.path.join(output_dir, output_filename)
+            result = _write_output(chunks(source), output_path, output_filename, target_format,
+                                   f"{name} - {title}" if suffix else name)
+            if result["success"]:
+                output_files.append(output_filename)
+    finally:
+        if workbook:
+            workbook.close()
+
+    if not output_files:
+        return {"success": False, "error": "Could not read data from file"}
+    result = {"success": True, "output_path": os.path.join(output_dir, output_files[0]), "filename": output_files[0]}
+    if len(output_files) > 1:
+        result["all_files"] = output_files
+        result["note"] = f"{len(output_files)} sayfa ayrı dosyalara yazıldı"
+    return result
+
+
+def _select_sheet(sheets: list, sheet: str):
+    """Pick a (title, sheet) pair by exact title or 1-based position."""
+    for entry in sheets:
+        if entry[0] == sheet:
+            return entry
+    if str(sheet).isdigit() and 1 <= int(sheet) <= len(sheets):
+        return sheets[int(sheet) - 1]
+    raise ValueError(f"Sheet not found: {sheet} (available: {', '.join(title for title, _ in sheets)})")
+
+
+def _sheet_chunks(worksheet):
+    """Yield DataFrames of up to CHUNK_ROWS rows from a read-only worksheet; the first row is the header."""
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return
+    # Same labels read_excel gives: "Unnamed: N" for blank headers, a, a.1, ... for repeats
+    columns = _dedup_columns([str(value) if value is not None else f"Unnamed: {i}" for i, value in enumerate(header)])
+
+    batch = []
+    for row in rows:
+        # Read-only mode reports formatted but empty rows as well
+        if all(value is None for value in row):
+            continue
+        if len(row) > len(columns):
+            # Cells beyond the header (stale sheet dimensions) get names instead of being cut off
+            columns = _dedup_columns(columns + [f"column_{i + 1}" for i in range(len(columns), len(row))])
+        batch.append(tuple(row))
+        if len(batch) == CHUNK_ROWS:
+            yield _sheet_frame(batch, columns)
+            batch = []
+    if batch:
+        yield _sheet_frame(batch, columns)
+
+
+def _sheet_frame(batch: list, columns: list) -> pd.DataFrame:
+    width = len(columns)
+    return pd.DataFrame.from_records([row + (None,) * (width - len(row)) for row in batch], columns=columns)
+
+
+def _dedup_columns(names: list) -> list:
+    """Make labels unique the way read_excel does: a, a.1, a.2, skipping suffixes already in the header."""
+    counts = {}
+    unique = []
+    for original in names:
+        name = original
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[original] = count + 1
+            name = f"{original}.{count}"
+            count = count + 1 if name in names else counts.get(name, 0)
+        counts[name] = count + 1
+        unique.append(name)
+    return unique
+
+
+def _write_xlsx(sheets: list, output_path: str) -> int:
+    """
+    Stream (title, chunks) pairs into a write-only workbook; returns the number of data rows.
+    A sheet that reaches EXCEL_MAX_ROWS continues on "<title> (2)", "<title> (3)", ...
+    """
+    workbook = Workbook(write_only=True)
+    total = 0
+    for title, chunks in sheets:
+        worksheet = None
+        part = 0
+        used = 0
+        header = None
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            if header is None:
+                header = [str(column) for column in chunk.columns]
+            # NaN/NA become empty cells; Arrow and NumPy scalars become Python values
+            values = chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+            for row in values:
+                if worksheet is None or used == EXCEL_MAX_ROWS:
+                    part += 1
+                    worksheet = workbook.create_sheet(_sheet_title(title, part))
+                    worksheet.append(_header_cells(worksheet, header))
+                    used = 1
+                worksheet.append(row)
+                used += 1
+                total += 1
+
+    if not workbook.worksheets:
+        workbook.create_sheet('Sheet1')
+    workbook.save(output_path)
+    return total
+
+
+def _sheet_title(title: str, part: int) -> str:
+    # Excel sheet titles are limited to 31 characters
+    if part == 1:
+        return title[:31]
+    suffix = f" ({part})"
+    return title[:31 - len(suffix)] + suffix
+
+
+def _header_cells(worksheet, header: list) -> list:
+    cells = []
+    for value in header:
+        cell = WriteOnlyCell(worksheet, value=value)
+        cell.font = Font(bold=True)
+        cells.append(cell)
+    return cells
+
+
+def _json_records(input_path: str, ext: str, record_path: str = None):
+    """
+    Yield JSON records one at a time: NDJSON lines, the items of a top-level array, or the array at
+    ``record_path`` (dotted keys). Without a path, a top-level object is searched for its first array.
+    """
+    if ext == '.jsonl' or _is_ndjson(input_path):
+        with open(input_path, 'r', encoding='utf-8-sig') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    if HAS_IJSON and record_path:
+        with open(input_path, 'rb') as f:
+            items = ijson.items(f, f"{record_path}.item", use_float=True)
+            first = next(items, None)
+            if first is not None:
+                yield first
+                yield from items
+                return
+        # Not an array at that path (or nothing there): the reader below reports which
+
+    if HAS_IJSON and not record_path:
+        with open(input_path, 'rb') as f:
+            start = 3 if f.read(3) == codecs.BOM_UTF8 else 0
+            f.seek(start)
+            if f.read(4096).lstrip()[:1] == b'[':
+                f.seek(start)
+                # Concatenated arrays ([...] [...]) are read as one sequence of records
+                yield from ijson.items(f, 'item', use_float=True, multiple_values=True)
+                return
+
+    path = [key for key in (record_path or '').split('.') if key]
+    with open(input_path, 'r', encoding='utf-8-sig') as f:
+        stream = _JsonStream(f)
+        nested = bool(path)
+        for key in path:
+            stream.enter_key(key)
+        if not nested and stream.peek() == '{':
+            # {"meta": ..., "items": [...]}: take the first array-valued key
+            found, fields = stream.enter_first_array()
+            if not found:
+                yield fields
+                return
+            nested = True
+
+        if nested:
+            if stream.peek() == '[':
+                yield from stream.items()
+            else:
+                yield stream.value()
+            return
+
+        # A top-level array, or several concatenated values
+        while stream.peek():
+            if stream.peek() == '[':
+                yield from stream.items()
+            else:
+                yield stream.value()
+
+
+def _is_ndjson(input_path: str) -> bool:
+    """True if the file starts with a complete JSON object on its own line, followed by more lines."""
+    with open(input_path, 'r', encoding='utf-8-sig') as f:
+        head = f.read(JSON_READ_SIZE)
+    first, newline, rest = head.lstrip().partition('\n')
+    if not newline or not rest.strip():
+        return False
+    try:
+        return isinstance(json.loads(first), dict)
+    except ValueError:
+        return False
+
+
+class _JsonStream:
+    """Minimal pull reader over a text file; only the value being decoded is held in memory."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        # Read at least as much as is buffered so one huge value costs O(n), not O(n^2)
+        data = self.f.read(max(JSON_READ_SIZE, len(self.buffer) - self.pos))
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it; '' at end of input."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Invalid JSON: expected '{char}' at {self.buffer[self.pos:self.pos + 20]!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number ending exactly at the buffer edge may continue in the next block
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def items(self):
+        """Yield the elements of the array at the current position."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ',':
+                self.pos += 1
+            else:
+                self.expect(']')
+                return
+
+    def _keys(self):
+        """Walk the object at the current position, stopping before each value."""
+        self.expect('{')
+        while self.peek() != '}':
+            key = self.value()
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos += 1
+        self.pos += 1
+
+    def enter_key(self, key: str):
+        for name in self._keys():
+            if name == key:
+                return
+            self.value()
+        raise ValueError(f"record_path key not found: {key}")
+
+    def enter_first_array(self):
+        """Stop at the first array-valued key; returns (found, fields skipped on the way)."""
+        fields = {}
+        for key in self._keys():
+            if self.peek() == '[':
+                return True, fields
+            fields[key] = self.value()
+        return False, fields
+
+
+def _xml_records(input_path: str, record_path: str = None):
+    """
+    Yield XML records as flat dicts with lxml iterparse, clearing each one after use.
+    ``record_path`` is a tag ("book") or a slash path from the root ("catalog/book");
+    without it the root's children are the records.
+    """
+    parts = [part for part in (record_path or '').split('/') if part]
+    stack = []
+    record_depth = None
+    for event, element in etree.iterparse(input_path, events=('start', 'end'), huge_tree=True):
+        if not isinstance(element.tag, str):
+            # Comments and processing instructions
+            continue
+        tag = etree.QName(element).localname
+        if event == 'start':
+            stack.append(tag)
+            continue
+
+        depth = len(stack)
+        stack.pop()
+        if record_depth is None:
+            if not parts:
+                matched = depth == 2
+            elif len(parts) == 1:
+                matched = tag == parts[0]
+            else:
+                matched = stack + [tag] == parts
+            if matched:
+                record_depth = depth
+        if record_depth != depth or (parts and tag != parts[-1]):
+            continue
+
+        yield _xml_record(element)
+        element.clear()
+        # Drop already processed siblings so the tree stays small
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+
+def _xml_record(element) -> dict:
+    """Attributes and leaf texts of an element; nested children flatten to "parent.child" keys."""
+    record = dict(element.attrib)
+    for child in element:
+        if not isinstance(child.tag, str):
+            continue
+        key = etree.QName(child).localname
+        if len(child):
+            values = {f"{key}.{name}": value for name, value in _xml_record(child).items()}
+        else:
+            values = {key: child.text.strip() if child.text and child.text.strip() else None}
+        for name, value in values.items():
+            # Repeated children become name, name_2, name_3, ...
+            unique, n = name, 1
+            while unique in record:
+                n += 1
+                unique = f"{name}_{n}"
+            record[unique] = value
+    if not record and element.text and element.text.strip():
+        record['value'] = element.text.strip()
+    return record
+
+
+def _record_chunks(records):
+    """Group records into normalized DataFrames of up to CHUNK_ROWS rows."""
+    batch = []
+    for record in records:
+        batch.append(record if isinstance(record, dict) else {'value': record})
+        if len(batch) == CHUNK_ROWS:
+            yield _infer_types(pd.json_normalize(batch))
+            batch = []
+    if batch:
+        yield _infer_types(pd.json_normalize(batch))
+
+
+def _infer_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Turn text columns that are entirely numeric into numbers (XML values are all strings)."""
+    for column in df.columns:
+        series = df[column]
+        if series.dtype == object or pd.api.types.is_string_dtype(series):
+            numbers = pd.to_numeric(series, errors='coerce')
+            if numbers.notna().sum() == series.notna().sum() and series.notna().any():
+                df[column] = numbers
+    return df
+
+
+def _write_output(chunks, output_path: str, output_filename: str, target_format: str, name: str) -> dict:
+    """Stream chunks into row-oriented targets; other targets are written from the concatenated frame."""
+    if target_format == 'html':
+        dropped = set()
+        result = _write_html(_aligned(chunks, dropped), output_path, output_filename, name)
+        return _with_dropped_note(result, dropped)
+    if target_format in STREAM_TARGETS:
+        return _stream_data(chunks, output_path, output_filename, target_format)
+    # Concatenation takes the union of every chunk's columns
+    frames = [frame for frame in chunks if not frame.empty]
+    if not frames:
+        return {"success": False, "error": "Could not read data from file"}
+    return _write_frame(pd.concat(frames, ignore_index=True), output_path, output_filename, target_format, name)
+
+
+def _aligned(chunks, dropped: set):
+    """
+    Keep every chunk on the first chunk's columns so headers and rows line up. Columns first seen
+    in a later chunk cannot join a header that is already written; their names are added to ``dropped``.
+    """
+    columns = None
+    for chunk in chunks:
+        if columns is None:
+            columns = chunk.columns
+        elif not chunk.columns.equals(columns):
+            dropped.update(str(column) for column in chunk.columns.difference(columns))
+            chunk = chunk.reindex(columns=columns)
+        yield chunk
+
+
+def _with_dropped_note(result: dict, dropped: set) -> dict:
+    if result.get("success") and dropped:
+        names = sorted(dropped)
+        listed = ', '.join(names[:10]) + (f" (+{len(names) - 10})" if len(names) > 10 else '')
+        note = f"Uyarı: ilk parçada olmayan {len(names)} sütun atlandı: {listed}"
+        result["note"] = f"{result['note']}; {note}" if result.get("note") else note
+    return result
+
+
+_HTML_HEADER = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{name}</title>
+    <title>{title}</title>
     <style>
         body {{ 
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; 
@@ -108,23 +831,165 @@ def _process_data(input_path: str, output_dir: str, target_format: str) -> dict:
         }}
         tr:hover {{ background-color: #f8f9fa; }}
         tr:nth-child(even) {{ background-color: #f5f5f5; }}
+        nav {{ margin-top: 20px; display: flex; gap: 16px; }}
     </style>
 </head>
 <body>
-    <h1>{name}</h1>
-    {df.to_html(index=False, classes='data-table', border=0)}
-</body>
-</html>"""
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-                
-        elif target_format == 'txt':
-            df.to_csv(output_path, index=False, sep='\t', encoding='utf-8')
-            
-        else:
-            return {"success": False, "error": f"Unsupported target format: {target_format}"}
+    <h1>{title}</h1>
+"""
+
+_HTML_TABLE = """    <table class="dataframe data-table">
+        <thead><tr>{cells}</tr></thead>
+        <tbody>
+"""
+
+_HTML_FOOTER = """</body>
+</html>
+"""
+
+
+def _write_html(chunks, output_path: str, output_filename: str, name: str) -> dict:
+    """
+    Write chunks as an HTML table row by row into a single page. When HTML_PAGE_ROWS is set and exceeded,
+    the table is split into linked <stem>_page_N.html files and output_path becomes an index.
+    """
+    page_rows = HTML_PAGE_ROWS if HTML_PAGE_ROWS > 0 else None
+    output_dir = os.path.dirname(output_path)
+    stem = output_filename[:-len('.html')]
+    pages = []  # (filename, first row, last row)
+    page = None
+    head = None
+    used = 0
+    rows = 0
+
+    def page_name(number):
+        return f"{stem}_page_{number}.html"
+
+    def close_page(has_next):
+        links = [f'<a href="{html.escape(page_name(len(pages) - 1))}">&larr; Önceki</a>'] if len(pages) > 1 else []
+        if has_next or len(pages) > 1:
+            links.append(f'<a href="{html.escape(output_filename)}">İçindekiler</a>')
+        if has_next:
+            links.append(f'<a href="{html.escape(page_name(len(pages) + 1))}">Sonraki &rarr;</a>')
+        page.write("        </tbody>\n    </table>\n")
+        if links:
+            page.write(f"    <nav>{' '.join(links)}</nav>\n")
+        page.write(_HTML_FOOTER)
+        page.close()
+
+    try:
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            if head is None:
+                cells = ''.join(f"<th>{html.escape(str(column))}</th>" for column in chunk.columns)
+                head = _HTML_TABLE.format(cells=cells)
 
+            start = 0
+            while start < len(chunk):
+                if page is None or used == page_rows:
+                    if page is not None:
+                        close_page(has_next=True)
+                    pages.append((page_name(len(pages) + 1), rows + 1, rows))
+                    page = open(os.path.join(output_dir, pages[-1][0]), 'w', encoding='utf-8')
+                    title = name if len(pages) == 1 else f"{name} ({len(pages)})"
+                    page.write(_HTML_HEADER.format(title=html.escape(title)))
+                    page.write(head)
+                    used = 0
+
+                part = chunk.iloc[start:] if page_rows is None else chunk.iloc[start:start + page_rows - used]
+                page.write(_html_rows(part))
+                start += len(part)
+                used += len(part)
+                rows += len(part)
+                pages[-1] = (pages[-1][0], pages[-1][1], rows)
+        if page is not None:
+            close_page(has_next=False)
+    except Exception:
+        if page is not None and not page.closed:
+            page.close()
+        raise
+
+    if not rows:
+        return {"success": False, "error": "Could not read data from file"}
+
+    if len(pages) == 1:
+        os.replace(os.path.join(output_dir, pages[0][0]), output_path)
         return {"success": True, "output_path": output_path, "filename": output_filename}
 
-    except Exception as e:
-        return {"success": False, "error": f"Data conversion error: {str(e)}"}
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(_HTML_HEADER.format(title=html.escape(name)))
+        f.write(f"    <p>{rows:,} satır, {len(pages)} sayfa</p>\n")
+        f.write(_HTML_TABLE.format(cells="<th>Sayfa</th><th>Satırlar</th>"))
+        for number, (filename, first, last) in enumerate(pages, 1):
+            link = f'<a href="{html.escape(filename)}">{number}</a>'
+            f.write(f"            <tr><td>{link}</td><td>{first:,} – {last:,}</td></tr>\n")
+        f.write("        </tbody>\n    </table>\n")
+        f.write(_HTML_FOOTER)
+
+    return {"success": True, "output_path": output_path, "filename": output_filename,
+            "all_files": [output_filename] + [filename for filename, _, _ in pages],
+            "note": f"{rows:,} satır {len(pages)} HTML sayfasına bölündü"}
+
+
+def _html_rows(df: pd.DataFrame) -> str:
+    """Escaped <tr> rows; missing values are empty cells and numbers keep their full precision."""
+    values = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    return ''.join(
+        '            <tr>' + ''.join('<td></td>' if value is None else f"<td>{html.escape(str(value))}</td>"
+                                     for value in row) + '</tr>\n'
+        for row in values
+    )
+
+
+def _stream_data(chunks, output_path: str, output_filename: str, target_format: str) -> dict:
+    """Write DataFrame chunks as they are read; memory is bounded by the chunk size."""
+    dropped = set()
+    rows = _write_chunks(chunks, output_path, target_format, dropped)
+    if not rows:
+        os.remove(output_path)
+        return {"success": False, "error": "Could not read data from file"}
+
+    return _with_dropped_note({"success": True, "output_path": output_path, "filename": output_filename,
+                               "note": f"{rows:,} satır parça parça işlendi"}, dropped)
+
+
+def _write_chunks(chunks, output_path: str, target_format: str, dropped: set) -> int:
+    """Append DataFrame chunks to output_path in target_format; returns the number of rows written."""
+    # JSON, JSONL and XML records carry their own keys; only header-based targets need one schema
+    if target_format in ['csv', 'txt', 'xlsx']:
+        chunks = _aligned(chunks, dropped)
+    if target_format == 'xlsx':
+        return _write_xlsx([('Sheet1', chunks)], output_path)
+
+    rows = 0
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        if target_format == 'json':
+            f.write('[')
+        elif target_format == 'xml':
+            f.write("<?xml version='1.0' encoding='utf-8'?>\n<data>\n")
+
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            first = rows == 0
+            rows += len(chunk)
+
+            if target_format in ['csv', 'txt']:
+                chunk.to_csv(f, index=False, header=first, sep='\t' if target_format == 'txt' else ',')
+            elif target_format == 'jsonl':
+                f.write(chunk.to_json(orient='records', lines=True, force_ascii=False).rstrip('\n') + '\n')
+            elif target_format == 'json':
+                # One record per line keeps the array valid without holding it in memory
+                records = chunk.to_json(orient='records', lines=True, force_ascii=False).rstrip('\n')
+                f.write(('\n' if first else ',\n') + records.replace('\n', ',\n'))
+            elif target_format == 'xml':
+                xml = chunk.to_xml(index=False, root_name='data', row_name='record', xml_declaration=False)
+                f.write(xml[xml.index('>') + 1:xml.rindex('</data>')].strip('\n') + '\n')
+
+        if target_format == 'json':
+            f.write('\n]\n' if rows else ']\n')
+        elif target_format == 'xml':
+            f.write('</data>\n')
+
+    return rows
@@ -5,8 +5,8 @@ Preserves formatting when converting to PDF.
 """
 import os
 import asyncio
-import subprocess
-import shutil
+
+from .office import office_to_pdf
 
 
 async def convert_docx(input_path: str, output_dir: str, target_format: str) -> dict:
@@ -24,12 +24,8 @@ def _process_docx(input_path: str, output_dir: str, target_format: str) -> dict:
 
         if target_format == 'pdf':
             return _docx_to_pdf(input_path, output_path, output_filename)
-        elif target_format == 'txt':
-            return _docx_to_txt(input_path, output_path, output_filename)
-        elif target_format == 'html':
-            return _docx_to_html(input_path, output_path, output_filename, name)
-        elif target_format == 'md':
-            return _docx_to_md(input_path, output_path, output_filename, name)
+        elif target_format in ['txt', 'html', 'md']:
+            return _docx_to_text(input_path, output_path, output_filename, target_format, name)
         else:
             return {"success": False, "error": f"Unsupported target format for DOCX: {target_format}"}
 
@@ -51,36 +47,9 @@ def _docx_to_pdf(input_path: str, output_path: str, output_filename: str) -> dic
     
     # Method 2: Try LibreOffice
     try:
-        libreoffice_paths = [
-            r"C:\Program Files\LibreOffice\program\soffice.exe",
-            r"C:\Program Files (x86)\LibreOffice\program\soffice.exe",
-            "soffice",  # If in PATH
-            "/usr/bin/soffice",  # Linux
-            "/Applications/LibreOffice.app/Contents/MacOS/soffice"  # macOS
-        ]
-        
-        soffice_path = None
-        for path in libreoffice_paths:
-            if os.path.exists(path) or shutil.which(path):
-                soffice_path = path
-                break
-        
-        if soffice_path:
-            output_dir = os.path.dirname(output_path)
-            result = subprocess.run([
-                soffice_path,
-                "--headless",
-                "--convert-to", "pdf",
-                "--outdir", output_dir,
-                input_path
-            ], capture_output=True, text=True, timeout=120)
-            
-            # LibreOffice outputs with original name
-            expected_output = os.path.join(output_dir, os.path.splitext(os.path.basename(input_path))[0] + ".pdf")
-            if os.path.exists(expected_output):
-                if expected_output != output_path:
-                    shutil.move(expected_output, output_path)
-                return {"success": True, "output_path": output_path, "filename": output_filename}
+        office_to_pdf(input_path, output_path)
+        if os.path.exists(output_path):
+            return {"success": True, "output_path": output_path, "filename": output_filename}
     except Exception as e:
         print(f"[DOCX→PDF] LibreOffice failed: {e}")
     
@@ -90,46 +59,234 @@ def _docx_to_pdf(input_path: str, output_path: str, output_filename: str) -> dic
     }
 
 
-def _docx_to_txt(input_path: str, output_path: str, output_filename: str) -> dict:
-    """Extract text from DOCX."""
-    try:
-        from docx import Document
-    except ImportError:
-        return {"success": False, "error": "python-docx not installed. Run 'pip install python-docx'"}
-    
-    doc = Document(input_path)
-    text_content = []
-    
-    for para in doc.paragraphs:
-        text_content.append(para.text)
-    
-    # Also extract text from tables
-    for table in doc.tables:
-        for row in table.rows:
-            row_text = [cell.text for cell in row.cells]
-            text_content.append("\t".join(row_text))
-    
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_NS = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+# w:numFmt values that render as bullets rather than numbers
+BULLET_FORMATS = {'bullet', 'none'}
+
+
+def _docx_to_text(input_path: str, output_path: str, output_filename: str, target_format: str, name: str) -> dict:
+    """Convert DOCX to TXT, HTML or MD, streaming blocks in body order to the file."""
+    blocks = _iter_docx_blocks(input_path)
+    if target_format == 'txt':
+        chunks = _txt_chunks(blocks)
+    elif target_format == 'html':
+        chunks = _html_chunks(blocks, name)
+    else:
+        chunks = _md_chunks(blocks, name)
+
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("\n".join(text_content))
-    
+        for chunk in chunks:
+            f.write(chunk)
+
     return {"success": True, "output_path": output_path, "filename": output_filename}
 
 
-def _docx_to_html(input_path: str, output_path: str, output_filename: str, name: str) -> dict:
-    """Convert DOCX to HTML with basic styling."""
-    try:
-        from docx import Document
-    except ImportError:
-        return {"success": False, "error": "python-docx not installed. Run 'pip install python-docx'"}
-    
-    doc = Document(input_path)
-    
-    html_content = f"""<!DOCTYPE html>
+def _iter_docx_blocks(input_path: str):
+    """
+    Stream word/document.xml with lxml iterparse and yield blocks in body order:
+    {"type": "heading", "level", "text"}, {"type": "paragraph", "text"},
+    {"type": "list_item", "level", "ordered", "number", "text"} and
+    {"type": "table", "rows": [[cell text, ...], ...]}.
+    Each top-level paragraph or table is cleared once it has been yielded.
+    """
+    import zipfile
+    from lxml import etree
+
+    with zipfile.ZipFile(input_path) as docx:
+        styles = _read_docx_styles(docx)
+        numbering = _read_docx_numbering(docx)
+        counters = {}
+
+        with docx.open('word/document.xml') as document:
+            paragraph_depth = table_depth = 0
+            for event, elem in etree.iterparse(document, events=('start', 'end'),
+                                                tag=(W_NS + 'p', W_NS + 'tbl')):
+                is_table = elem.tag == W_NS + 'tbl'
+                if event == 'start':
+                    if is_table:
+                        table_depth += 1
+                    else:
+                        paragraph_depth += 1
+                    continue
+
+                if is_table:
+                    table_depth -= 1
+                    if table_depth or paragraph_depth:
+                        continue
+                    block = {"type": "table", "rows": _table_rows(elem)}
+                else:
+                    paragraph_depth -= 1
+                    # Text boxes nest paragraphs; only outermost body paragraphs are blocks
+                    if table_depth or paragraph_depth:
+                        continue
+                    block = _paragraph_block(elem, styles, numbering, counters)
+
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+                if block:
+                    yield block
+
+
+def _read_docx_styles(docx) -> dict:
+    """styleId -> (heading level or 0, (numId, ilvl) or None) from word/styles.xml."""
+    from lxml import etree
+
+    styles = {}
+    if 'word/styles.xml' not in docx.namelist():
+        return styles
+    with docx.open('word/styles.xml') as f:
+        root = etree.parse(f).getroot()
+    for style in root.iter(W_NS + 'style'):
+        style_id = style.get(W_NS + 'styleId')
+        name = style.find(W_NS + 'name')
+        name = (name.get(W_NS + 'val') if name is not None else '').lower()
+        level = 0
+        if name == 'title':
+            level = 1
+        elif name.startswith('heading ') and name[8:].isdigit():
+            level = int(name[8:])
+        else:
+            outline = style.find(f'{W_NS}pPr/{W_NS}outlineLvl')
+            if outline is not None and outline.get(W_NS + 'val', '9').isdigit() and int(outline.get(W_NS + 'val')) < 9:
+                level = int(outline.get(W_NS + 'val')) + 1
+        styles[style_id] = (level, _num_pr(style.find(W_NS + 'pPr')))
+    return styles
+
+
+def _read_docx_numbering(docx) -> dict:
+    """numId -> {ilvl: (ordered, start)} from word/numbering.xml."""
+    from lxml import etree
+
+    if 'word/numbering.xml' not in docx.namelist():
+        return {}
+    with docx.open('word/numbering.xml') as f:
+        root = etree.parse(f).getroot()
+
+    abstract = {}
+    for abstract_num in root.iter(W_NS + 'abstractNum'):
+        levels = {}
+        for lvl in abstract_num.iter(W_NS + 'lvl'):
+            num_fmt = lvl.find(W_NS + 'numFmt')
+            start = lvl.find(W_NS + 'start')
+            levels[lvl.get(W_NS + 'ilvl')] = (
+                num_fmt is not None and num_fmt.get(W_NS + 'val') not in BULLET_FORMATS,
+                int(start.get(W_NS + 'val')) if start is not None else 1
+            )
+        abstract[abstract_num.get(W_NS + 'abstractNumId')] = levels
+
+    numbering = {}
+    for num in root.iter(W_NS + 'num'):
+        abstract_id = num.find(W_NS + 'abstractNumId')
+        if abstract_id is not None:
+            numbering[num.get(W_NS + 'numId')] = abstract.get(abstract_id.get(W_NS + 'val'), {})
+    return numbering
+
+
+def _num_pr(ppr):
+    """(numId, ilvl) from a w:pPr element, if it has list numbering."""
+    if ppr is None:
+        return None
+    num_pr = ppr.find(W_NS + 'numPr')
+    if num_pr is None:
+        return None
+    num_id = num_pr.find(W_NS + 'numId')
+    ilvl = num_pr.find(W_NS + 'ilvl')
+    if num_id is None:
+        return None
+    return num_id.get(W_NS + 'val'), ilvl.get(W_NS + 'val') if ilvl is not None else '0'
+
+
+def _paragraph_text(elem) -> str:
+    parts = []
+    _collect_text(elem, parts)
+    return ''.join(parts)
+
+
+def _collect_text(elem, parts: list):
+    """Run text in document order; property subtrees (e.g. pPr/tabs/tab stops) are not content."""
+    for node in elem:
+        if node.tag == W_NS + 't':
+            parts.append(node.text or '')
+        elif node.tag == W_NS + 'tab':
+            parts.append('\t')
+        elif node.tag in (W_NS + 'br', W_NS + 'cr'):
+            parts.append('\n')
+        elif node.tag in (W_NS + 'pPr', W_NS + 'rPr'):
+            continue
+        elif node.tag == MC_NS + 'AlternateContent':
+            # Choice and Fallback hold the same textbox twice (DrawingML and VML)
+            branch = node.find(MC_NS + 'Choice')
+            if branch is None:
+                branch = node.find(MC_NS + 'Fallback')
+            if branch is not None:
+                _collect_text(branch, parts)
+        else:
+            _collect_text(node, parts)
+
+
+def _paragraph_block(elem, styles: dict, numbering: dict, counters: dict):
+    text = _paragraph_text(elem)
+    if not text.strip():
+        return None
+
+    ppr = elem.find(W_NS + 'pPr')
+    style_level, style_num = 0, None
+    if ppr is not None:
+        style = ppr.find(W_NS + 'pStyle')
+        if style is not None:
+            style_level, style_num = styles.get(style.get(W_NS + 'val'), (0, None))
+        outline = ppr.find(W_NS + 'outlineLvl')
+        if outline is not None and outline.get(W_NS + 'val', '9').isdigit() and int(outline.get(W_NS + 'val')) < 9:
+            style_level = int(outline.get(W_NS + 'val')) + 1
+
+    if style_level:
+        return {"type": "heading", "level": style_level, "text": text}
+
+    num = _num_pr(ppr) or style_num
+    if num and num[0] != '0':  # numId 0 switches numbering off
+        num_id, ilvl = num
+        ordered, start = numbering.get(num_id, {}).get(ilvl, (False, 1))
+        level = int(ilvl) if ilvl.isdigit() else 0
+        # Deeper levels restart when a shallower item appears
+        for key in [key for key in counters if key[0] == num_id and key[1] > level]:
+            del counters[key]
+        number = counters.get((num_id, level), start - 1) + 1
+        counters[(num_id, level)] = number
+        return {"type": "list_item", "level": level, "ordered": ordered, "number": number, "text": text}
+
+    return {"type": "paragraph", "text": text}
+
+
+def _table_rows(elem) -> list:
+    rows = []
+    for tr in elem.iterchildren(W_NS + 'tr'):
+        cells = []
+        for tc in tr.iterchildren(W_NS + 'tc'):
+            paragraphs = [_paragraph_text(p) for p in tc.iter(W_NS + 'p')]
+            cells.append('\n'.join(text for text in paragraphs if text))
+        rows.append(cells)
+    return rows
+
+
+def _txt_chunks(blocks):
+    for block in blocks:
+        if block["type"] == "table":
+            yield "".join("\t".join(cells) + "\n" for cells in block["rows"])
+        elif block["type"] == "list_item":
+            marker = f"{block['number']}." if block["ordered"] else "-"
+            yield f"{'  ' * block['level']}{marker} {block['text']}\n"
+        else:
+            yield block["text"] + "\n"
+
+
+_HTML_HEADER = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{name}</title>
+    <title>{title}</title>
     <style>
         body {{ 
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; 
@@ -149,75 +306,81 @@ def _docx_to_html(input_path: str, output_path: str, output_filename: str, name:
 </head>
 <body>
 """
-    
-    for para in doc.paragraphs:
-        if para.text.strip():
-            style_name = para.style.name if para.style else ""
-            if "Heading 1" in style_name:
-                html_content += f"    <h1>{para.text}</h1>\n"
-            elif "Heading 2" in style_name:
-                html_content += f"    <h2>{para.text}</h2>\n"
-            elif "Heading 3" in style_name:
-                html_content += f"    <h3>{para.text}</h3>\n"
-            else:
-                html_content += f"    <p>{para.text}</p>\n"
-    
-    # Convert tables
-    for table in doc.tables:
-        html_content += "    <table>\n"
-        for i, row in enumerate(table.rows):
-            html_content += "        <tr>\n"
-            tag = "th" if i == 0 else "td"
-            for cell in row.cells:
-                html_content += f"            <{tag}>{cell.text}</{tag}>\n"
-            html_content += "        </tr>\n"
-        html_content += "    </table>\n"
-    
-    html_content += "</body>\n</html>"
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    return {"success": True, "output_path": output_path, "filename": output_filename}
 
 
-def _docx_to_md(input_path: str, output_path: str, output_filename: str, name: str) -> dict:
-    """Convert DOCX to Markdown."""
-    try:
-        from docx import Document
-    except ImportError:
-        return {"success": False, "error": "python-docx not installed. Run 'pip install python-docx'"}
-    
-    doc = Document(input_path)
-    md_content = f"# {name}\n\n"
-    
-    for para in doc.paragraphs:
-        if para.text.strip():
-            style_name = para.style.name if para.style else ""
-            if "Heading 1" in style_name:
-                md_content += f"# {para.text}\n\n"
-            elif "Heading 2" in style_name:
-                md_content += f"## {para.text}\n\n"
-            elif "Heading 3" in style_name:
-                md_content += f"### {para.text}\n\n"
-            else:
-                md_content += f"{para.text}\n\n"
-    
-    # Convert tables to markdown
-    for table in doc.tables:
-        if table.rows:
-            # Header row
-            header = [cell.text for cell in table.rows[0].cells]
-            md_content += "| " + " | ".join(header) + " |\n"
-            md_content += "| " + " | ".join(["---"] * len(header)) + " |\n"
-            
-            # Data rows
-            for row in table.rows[1:]:
-                cells = [cell.text for cell in row.cells]
-                md_content += "| " + " | ".join(cells) + " |\n"
-            md_content += "\n"
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(md_content)
-    
-    return {"success": True, "output_path": output_path, "filename": output_filename}
+def _html_chunks(blocks, name: str):
+    from html import escape
+
+    def cell_html(text):
+        return escape(text).replace('\n', '<br>')
+
+    yield _HTML_HEADER.format(title=escape(name))
+    open_lists = []  # tag of each open list, outermost first
+    for block in blocks:
+        if block["type"] == "list_item":
+            tag = "ol" if block["ordered"] else "ul"
+            while len(open_lists) > block["level"] + 1 or (len(open_lists) == block["level"] + 1 and open_lists[-1] != tag):
+                yield f"    </{open_lists.pop()}>\n"
+            while len(open_lists) < block["level"] + 1:
+                open_lists.append(tag)
+                yield f"    <{tag}>\n"
+            yield f"        <li>{escape(block['text'])}</li>\n"
+            continue
+
+        while open_lists:
+            yield f"    </{open_lists.pop()}>\n"
+
+        if block["type"] == "heading":
+            tag = f"h{min(block['level'], 6)}"
+            yield f"    <{tag}>{escape(block['text'])}</{tag}>\n"
+        elif block["type"] == "table":
+            parts = ["    <table>\n"]
+            for i, cells in enumerate(block["rows"]):
+                tag = "th" if i == 0 else "td"
+                parts.append("        <tr>\n")
+                parts.extend(f"            <{tag}>{cell_html(cell)}</{tag}>\n" for cell in cells)
+                parts.append("        </tr>\n")
+            parts.append("    </table>\n")
+            yield "".join(parts)
+        else:
+            yield f"    <p>{escape(block['text'])}</p>\n"
+
+    while open_lists:
+        yield f"    </{open_lists.pop()}>\n"
+    yield "</body>\n</html>"
+
+
+def _md_chunks(blocks, name: str):
+    def cell_md(text):
+        return text.replace('|', '\\|').replace('\n', '<br>')
+
+    yield f"# {name}\n\n"
+    in_list = False
+    for block in blocks:
+        if block["type"] == "list_item":
+            marker = f"{block['number']}." if block["ordered"] else "-"
+            yield f"{'   ' * block['level']}{marker} {block['text']}\n"
+            in_list = True
+            continue
+        if in_list:
+            yield "\n"
+            in_list = False
+
+        if block["type"] == "heading":
+            yield f"{'#' * min(block['level'], 6)} {block['text']}\n\n"
+        elif block["type"] == "table":
+            rows = block["rows"]
+            if not rows:
+                continue
+            width = max(len(cells) for cells in rows)
+            parts = []
+            for i, cells in enumerate(rows):
+                cells = [cell_md(cell) for cell in cells] + [""] * (width - len(cells))
+                parts.append("| " + " | ".join(cells) + " |\n")
+                if i == 0:
+                    parts.append("| " + " | ".join(["---"] * width) + " |\n")
+            yield "".join(parts) + "\n"
+        else:
+            yield f"{block['text']}\n\n"
+    if in_list:
+        yield "\n"
@@ -4,7 +4,13 @@ Converts images between all major formats using Pillow.
 Supports: JPG, PNG, WEBP, HEIC, SVG, ICO, BMP, GIF, TIFF, AVIF, PDF
 """
 import os
+import io
+import zlib
+import struct
 import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 
 # Register HEIF/HEIC opener if available
@@ -23,13 +29,88 @@ except:
     HAS_AVIF = False
 
 
-async def convert_image(input_path: str, output_dir: str, target_format: str, quality: str = "high") -> dict:
-    """Image converter with format detection and quality settings."""
+# Largest ICO entry; ICO targets never need to be decoded beyond this
+ICO_MAX_SIZE = 256
+
+# How far above the target size draft()/reduce() may stop before the final
+# LANCZOS pass; 2.0 is visually indistinguishable from a full resample.
+REDUCING_GAP = 2.0
+
+# Frame delay used when an animated source does not declare one (ms)
+DEFAULT_FRAME_DURATION = 100
+
+# Images above this pixel count are read, flattened and written in strips
+LARGE_IMAGE_PIXELS = int(os.environ.get('UC_LARGE_IMAGE_PIXELS', 100_000_000))
+
+# Ceiling for rasters past Pillow's decompression-bomb guard; only uncompressed,
+# strip-readable files are let through, everything else keeps Pillow's limit
+STRIP_MAX_PIXELS = int(os.environ.get('UC_MAX_IMAGE_PIXELS', 1_000_000_000))
+
+# Memory budget for one strip of a large image, and TIFF strip size on output
+STRIP_BYTES = 64 * 1024 * 1024
+TIFF_STRIP_BYTES = 1024 * 1024
+
+# SVG render resolution when none is requested (2x of the CSS 96 DPI)
+SVG_DEFAULT_DPI = 192
+
+# Parsed SVG trees kept for repeated renders (multi-size icons etc.)
+SVG_CACHE_SIZE = 16
+_svg_cache = OrderedDict()
+_svg_cache_lock = threading.Lock()
+
+
+async def convert_image(input_path: str, output_dir: str, target_format: str, quality: str = "high",
+                        max_size: int = None, dpi: int = None) -> dict:
+    """Image converter with format detection, quality settings and optional downscaling."""
     loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, _process_image, input_path, output_dir, target_format, quality)
+    return await loop.run_in_executor(None, _process_image, input_path, output_dir, target_format, quality,
+                                      max_size, dpi)
+
+
+async def convert_image_multi(input_path: str, output_dir: str, targets: list, quality: str = "high") -> dict:
+    """
+    Convert one image to several targets with a single decode.
+    `targets` is a list of {"format": ..., "max_size": ...} dicts.
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, _process_image_multi, input_path, output_dir, targets, quality)
+
+
+def _decode_bound(target_format: str, max_size: int = None):
+    """Largest edge the decoded image needs for this target, or None for full size."""
+    if target_format == 'ico':
+        return min(max_size, ICO_MAX_SIZE) if max_size else ICO_MAX_SIZE
+    return max_size
+
+
+def _decode_reduced(img: Image.Image, max_size: int = None) -> Image.Image:
+    """
+    Decode `img` at the smallest resolution that still covers `max_size`.
+    JPEGs are drafted first so libjpeg decodes straight to 1/2, 1/4 or 1/8
+    scale; resize() then uses reduce() for the remaining integer factor, so
+    a large downscale never materializes the full-resolution bitmap.
+    """
+    if not max_size or max(img.size) <= max_size:
+        return img
+
+    scale = max_size / max(img.size)
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
 
+    box = None
+    if img.format == 'JPEG':
+        drafted = img.draft(None, (int(size[0] * REDUCING_GAP), int(size[1] * REDUCING_GAP)))
+        if drafted is not None:
+            box = drafted[1]
 
-def _process_image(input_path: str, output_dir: str, target_format: str, quality: str) -> dict:
+    # Palette images would be resized with NEAREST; go through RGBA instead
+    if img.mode in ['P', '1']:
+        img = img.convert('RGBA' if img.mode == 'P' else 'L')
+
+    return img.resize(size, Image.LANCZOS, box=box, reducing_gap=REDUCING_GAP)
+
+
+def _process_image(input_path: str, output_dir: str, target_format: str, quality: str,
+                   max_size: int = None, dpi: int = None) -> dict:
     try:
         filename = os.path.basename(input_path)
         name, ext = os.path.splitext(filename)
@@ -39,131 +120,628 @@ def _process_image(input_path: str, output_dir: str, target_format: str, quality
         
         # === SVG HANDLING (Special case - vector format) ===
         if ext_lower == '.svg':
-            return _convert_svg(input_path, output_path, output_filename, target_format)
+            return _convert_svg(input_path, output_path, output_filename, target_format, quality, max_size, dpi)
         
         # === OPEN IMAGE ===
-        with Image.open(input_path) as img:
-            # Get original format info
-            original_mode = img.mode
-            
-            # === FORMAT-SPECIFIC CONVERSION ===
-            
-            # Convert to RGB for formats that don't support alpha
-            if target_format in ['jpg', 'jpeg', 'bmp', 'pdf'] and original_mode in ['RGBA', 'P', 'LA']:
-                # Create white background for transparency
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                if img.mode in ['RGBA', 'LA']:
-                    background.paste(img, mask=img.split()[-1])
-                    img = background
-                else:
-                    img = img.convert('RGB')
-            
-            # Quality settings based on user preference
-            quality_value = 95 if quality == 'high' else 80
-            
-            # === SAVE WITH FORMAT-SPECIFIC OPTIONS ===
-            
-            if target_format in ['jpg', 'jpeg']:
-                save_kwargs = {
-                    'quality': quality_value,
-                    'subsampling': 0 if quality == 'high' else 2,
-                    'optimize': True
-                }
-                img.save(output_path, 'JPEG', **save_kwargs)
-                
-            elif target_format == 'png':
-                save_kwargs = {'optimize': True}
-                if quality != 'high':
-                    save_kwargs['compress_level'] = 9
-                img.save(output_path, 'PNG', **save_kwargs)
-                
-            elif target_format == 'webp':
-                save_kwargs = {
-                    'quality': quality_value,
-                    'method': 6 if quality == 'high' else 4
-                }
-                # Preserve animation for animated WebP
-                if getattr(img, 'n_frames', 1) > 1:
-                    save_kwargs['save_all'] = True
-                img.save(output_path, 'WEBP', **save_kwargs)
-                
-            elif target_format == 'gif':
-                if img.mode != 'P':
-                    img = img.convert('P', palette=Image.ADAPTIVE, colors=256)
-                save_kwargs = {'optimize': True}
-                # Preserve animation
+        try:
+            img = Image.open(input_path)
+        except Image.DecompressionBombError:
+            # Too large to decode whole; only rasters that can be read strip by strip go on
+            if not _strip_readable(input_path, target_format, max_size):
+                raise
+            return _convert_large_image(input_path, output_path, output_filename, target_format, quality)
+
+        with img:
+            # Huge stills are processed strip by strip at full resolution
+            if (img.width * img.height > LARGE_IMAGE_PIXELS and getattr(img, 'n_frames', 1) == 1
+                    and img.mode in ['1', 'L', 'LA', 'P', 'RGB', 'RGBA', 'CMYK', 'YCbCr']
+                    and _decode_bound(target_format, max_size) is None):
+                return _convert_large_image(input_path, output_path, output_filename, target_format, quality)
+
+            # Animated GIF/WebP targets are streamed frame by frame
+            if getattr(img, 'n_frames', 1) > 1 and target_format in ['gif', 'webp']:
+                return _convert_animation(img, output_path, output_filename, target_format, quality, max_size)
+
+            # Every other target takes the first frame
+            n_frames = getattr(img, 'n_frames', 1)
+            img = _decode_reduced(img, _decode_bound(target_format, max_size))
+
+            result = _save_image(img, output_path, output_filename, target_format, quality)
+            if n_frames > 1 and result["success"]:
+                result["note"] = f"Animasyonun yalnızca ilk karesi dönüştürüldü ({n_frames} kare)"
+            return result
+
+    except Exception as e:
+        return {"success": False, "error": f"Resim dönüşüm hatası: {str(e)}"}
+
+
+def _process_image_multi(input_path: str, output_dir: str, targets: list, quality: str) -> dict:
+    """Decode once, then run every target's save branch concurrently on the shared pixels."""
+    try:
+        filename = os.path.basename(input_path)
+        name, ext = os.path.splitext(filename)
+
+        if not targets:
+            return {"success": False, "error": "Hedef format belirtilmedi"}
+        for target in targets:
+            max_size = target.get("max_size")
+            if max_size is not None and (not isinstance(max_size, int) or max_size <= 0):
+                return {"success": False, "error": f"Geçersiz boyut: {max_size} (pozitif tam sayı olmalı)"}
+
+        # Repeated (format, max_size) pairs would write the same file from two threads
+        jobs = {}
+        for target in targets:
+            target_format = target["format"].lower()
+            max_size = target.get("max_size")
+            output_filename = f"{name}_{max_size}.{target_format}" if max_size else f"{name}.{target_format}"
+            jobs.setdefault(output_filename, (target_format, max_size, output_filename))
+        jobs = list(jobs.values())
+
+        if ext.lower() == '.svg':
+            results = _convert_each(input_path, output_dir, jobs, quality)
+        else:
+            with Image.open(input_path) as img:
                 if getattr(img, 'n_frames', 1) > 1:
-                    save_kwargs['save_all'] = True
-                    save_kwargs['loop'] = 0
-                img.save(output_path, 'GIF', **save_kwargs)
-                
-            elif target_format == 'bmp':
-                img.save(output_path, 'BMP')
-                
-            elif target_format in ['tiff', 'tif']:
-                save_kwargs = {'compression': 'tiff_lzw' if quality == 'high' else 'tiff_deflate'}
-                img.save(output_path, 'TIFF', **save_kwargs)
-                
-            elif target_format == 'ico':
-                # ICO requires specific sizes
-                sizes = [(256, 256), (128, 128), (64, 64), (48, 48), (32, 32), (16, 16)]
-                img_copy = img.copy()
-                img_copy.thumbnail((256, 256), Image.LANCZOS)
-                img_copy.save(output_path, 'ICO', sizes=sizes)
-                
-            elif target_format == 'pdf':
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                img.save(output_path, 'PDF', resolution=150.0)
-                
-            elif target_format in ['heic', 'heif']:
-                if not HAS_HEIF:
-                    return {"success": False, "error": "pillow-heif yüklü değil. 'pip install pillow-heif' çalıştırın."}
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                img.save(output_path, 'HEIF', quality=quality_value)
-                
-            elif target_format == 'avif':
-                if not HAS_AVIF:
-                    return {"success": False, "error": "AVIF desteği için Pillow 9.1+ ve libavif gerekli."}
-                save_kwargs = {'quality': quality_value}
-                img.save(output_path, 'AVIF', **save_kwargs)
-                
-            else:
-                # Generic save for other formats
-                img.save(output_path)
-            
-        return {"success": True, "output_path": output_path, "filename": output_filename}
+                    # Animated sources are streamed per target to keep their frames
+                    results = _convert_each(input_path, output_dir, jobs, quality)
+                else:
+                    # Decode once at the largest size any target needs
+                    bounds = [_decode_bound(fmt, size) for fmt, size, _ in jobs]
+                    base = _decode_reduced(img, None if None in bounds else max(bounds))
+                    base.load()
+                    results = _save_targets(base, output_dir, jobs, quality)
+
+        output_files = [r["filename"] for r in results if r["success"]]
+        errors = [{"format": fmt, "error": r["error"]} for (fmt, _, _), r in zip(jobs, results) if not r["success"]]
+
+        if not output_files:
+            return {"success": False, "error": errors[0]["error"] if errors else "Hedef format belirtilmedi"}
+
+        result = {
+            "success": True,
+            "output_path": os.path.join(output_dir, output_files[0]),
+            "filename": output_files[0],
+            "all_files": output_files,
+            "note": f"{len(output_files)} dosya oluşturuldu"
+        }
+        if errors:
+            result["errors"] = errors
+        return result
 
     except Exception as e:
         return {"success": False, "error": f"Resim dönüşüm hatası: {str(e)}"}
 
 
-def _convert_svg(input_path: str, output_path: str, output_filename: str, target_format: str) -> dict:
-    """Convert SVG to raster formats using cairosvg."""
+def _convert_each(input_path: str, output_dir: str, jobs: list, quality: str) -> list:
+    """Sequential fallback for sources that cannot share one decoded buffer."""
+    results = []
+    for fmt, size, output_filename in jobs:
+        result = _process_image(input_path, output_dir, fmt, quality, size)
+        if result["success"] and result["filename"] != output_filename:
+            output_path = os.path.join(output_dir, output_filename)
+            os.replace(result["output_path"], output_path)
+            result.update(output_path=output_path, filename=output_filename)
+        results.append(result)
+    return results
+
+
+def _save_targets(base: Image.Image, output_dir: str, jobs: list, quality: str) -> list:
+    """Run the format-specific save branches concurrently; Pillow's encoders release the GIL."""
+    def run(job):
+        fmt, size, output_filename = job
+        # Resizing only reads the shared pixels; save() keeps per-call encoder state
+        # on the instance, so a full-size target encodes from its own copy
+        view = _decode_reduced(base, _decode_bound(fmt, size))
+        if view is base:
+            view = base.copy()
+        output_path = os.path.join(output_dir, output_filename)
+        try:
+            return _save_image(view, output_path, output_filename, fmt, quality)
+        except Exception as e:
+            return {"success": False, "error": f"Resim dönüşüm hatası: {str(e)}"}
+
+    with ThreadPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as pool:
+        return list(pool.map(run, jobs))
+
+
+def _save_image(img: Image.Image, output_path: str, output_filename: str, target_format: str, quality: str) -> dict:
+    """Flatten if needed and save `img` with the format-specific encoder options."""
+    # Get original format info
+    original_mode = img.mode
+    
+    # === FORMAT-SPECIFIC CONVERSION ===
+    
+    # Convert to RGB for formats that don't support alpha
+    if target_format in ['jpg', 'jpeg', 'bmp', 'pdf'] and original_mode in ['RGBA', 'P', 'LA']:
+        # Create white background for transparency
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        if img.mode in ['RGBA', 'LA']:
+            background.paste(img, mask=img.split()[-1])
+            img = background
+        else:
+            img = img.convert('RGB')
+    
+    # Quality settings based on user preference
+    quality_value = 95 if quality == 'high' else 80
+    
+    # === SAVE WITH FORMAT-SPECIFIC OPTIONS ===
+    
+    if target_format in ['jpg', 'jpeg']:
+        save_kwargs = {
+            'quality': quality_value,
+            'subsampling': 0 if quality == 'high' else 2,
+            'optimize': True
+        }
+        img.save(output_path, 'JPEG', **save_kwargs)
+        
+    elif target_format == 'png':
+        save_kwargs = {'optimize': True}
+        if quality != 'high':
+            save_kwargs['compress_level'] = 9
+        img.save(output_path, 'PNG', **save_kwargs)
+        
+    elif target_format == 'webp':
+        save_kwargs = {
+            'quality': quality_value,
+            'method': 6 if quality == 'high' else 4
+        }
+        img.save(output_path, 'WEBP', **save_kwargs)
+        
+    elif target_format == 'gif':
+        if img.mode != 'P':
+            img = img.convert('P', palette=Image.ADAPTIVE, colors=256)
+        img.save(output_path, 'GIF', optimize=True)
+        
+    elif target_format == 'bmp':
+        img.save(output_path, 'BMP')
+        
+    elif target_format in ['tiff', 'tif']:
+        save_kwargs = {'compression': 'tiff_lzw' if quality == 'high' else 'tiff_deflate'}
+        img.save(output_path, 'TIFF', **save_kwargs)
+        
+    elif target_format == 'ico':
+        # ICO requires specific sizes; the image was already decoded at <= 256px
+        sizes = [(256, 256), (128, 128), (64, 64), (48, 48), (32, 32), (16, 16)]
+        img = _decode_reduced(img, ICO_MAX_SIZE)
+        img.save(output_path, 'ICO', sizes=sizes)
+        
+    elif target_format == 'pdf':
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.save(output_path, 'PDF', resolution=150.0)
+        
+    elif target_format in ['heic', 'heif']:
+        if not HAS_HEIF:
+            return {"success": False, "error": "pillow-heif yüklü değil. 'pip install pillow-heif' çalıştırın."}
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.save(output_path, 'HEIF', quality=quality_value)
+        
+    elif target_format == 'avif':
+        if not HAS_AVIF:
+            return {"success": False, "error": "AVIF desteği için Pillow 9.1+ ve libavif gerekli."}
+        save_kwargs = {'quality': quality_value}
+        img.save(output_path, 'AVIF', **save_kwargs)
+        
+    else:
+        # Generic save for other formats
+        img.save(output_path)
+
+    return {"success": True, "output_path": output_path, "filename": output_filename}
+
+
+def _open_unchecked(input_path: str):
+    """Parse an image header without Pillow's decompression-bomb check; pixels are not read."""
+    Image.init()
+    image_format = Image.registered_extensions().get(os.path.splitext(input_path)[1].lower())
+    if image_format not in Image.OPEN:
+        return Image.open(input_path)
+    return Image.OPEN[image_format][0](input_path)
+
+
+def _strip_readable(input_path: str, target_format: str, max_size: int) -> bool:
+    """True if an oversized still is stored as plain rows within STRIP_MAX_PIXELS."""
+    try:
+        with _open_unchecked(input_path) as img:
+            return (img.width * img.height <= STRIP_MAX_PIXELS and getattr(img, 'n_frames', 1) == 1
+                    and img.mode in ['1', 'L', 'LA', 'RGB', 'RGBA', 'CMYK', 'YCbCr']
+                    and _decode_bound(target_format, max_size) is None
+                    and _raw_layout(img, os.path.getsize(input_path)) is not None)
+    except Exception:
+        return False
+
+
+def _convert_large_image(input_path: str, output_path: str, output_filename: str, target_format: str,
+                         quality: str) -> dict:
+    """
+    Convert a huge raster strip by strip. Strips are read straight from
+    the file where its layout allows, flattened one at a time, and streamed
+    into PNG/TIFF output; other encoders get a single canvas in the output
+    mode instead of the source plus a full-size background copy.
+    """
+    # Callers either opened the file normally or checked _strip_readable()
+    with _open_unchecked(input_path) as img:
+        size, mode = img.size, img.mode
+        has_alpha = mode in ['LA', 'RGBA', 'PA'] or 'transparency' in img.info
+
+    flatten = target_format in ['jpg', 'jpeg', 'bmp', 'pdf']
+    out_mode = ('L' if mode in ['1', 'L', 'LA'] else 'RGB') + ('A' if has_alpha and not flatten else '')
+    strip_height = max(1, STRIP_BYTES // (size[0] * 4))
+    strips = (_prepare_strip(strip, out_mode, flatten) for strip in _iter_strips(input_path, strip_height))
+
+    if target_format == 'png':
+        _write_png_strips(strips, output_path, size, out_mode, 6 if quality == 'high' else 9)
+    elif target_format in ['tiff', 'tif']:
+        _write_tiff_strips(strips, output_path, size, out_mode, 6 if quality == 'high' else 9)
+    else:
+        canvas = Image.new(out_mode, size)
+        top = 0
+        for strip in strips:
+            canvas.paste(strip, (0, top))
+            top += strip.height
+        return _save_image(canvas, output_path, output_filename, target_format, quality)
+
+    return {"success": True, "output_path": output_path, "filename": output_filename}
+
+
+def _iter_strips(input_path: str, strip_height: int):
+    """
+    Yield horizontal strips of an image from top to bottom. Uncompressed
+    rasters (TIFF, BMP, PPM, TGA...) are read straight from the file one
+    strip at a time; compressed streams are decoded once and cropped.
+    """
+    with _open_unchecked(input_path) as img:
+        width, height = img.size
+        mode = img.mode
+        layout = _raw_layout(img, os.path.getsize(input_path))
+
+        if layout is None:
+            img.load()
+            for top in range(0, height, strip_height):
+                yield img.crop((0, top, width, min(top + strip_height, height)))
+            return
+
+    offset, rawmode, stride, ystep = layout
+    with open(input_path, 'rb') as f:
+        for top in range(0, height, strip_height):
+            bottom = min(top + strip_height, height)
+            # Bottom-up files (BMP) store the last row first
+            f.seek(offset + (top if ystep > 0 else height - bottom) * stride)
+            data = f.read((bottom - top) * stride)
+            yield Image.frombytes(mode, (width, bottom - top), data, 'raw', rawmode, stride, ystep)
+
+
+def _raw_layout(img: Image.Image, file_size: int):
+    """(offset, rawmode, stride, ystep) if the pixels are stored as plain rows, else None."""
+    if img.mode == 'P' or len(img.tile) != 1:
+        return None
+    name, (x0, y0, x1, y1), offset, args = img.tile[0]
+    if name != 'raw' or (x0, y0, x1, y1) != (0, 0) + img.size:
+        return None
+
+    rawmode, stride, ystep = (tuple(args) + (0, 1))[:3] if isinstance(args, tuple) else (args, 0, 1)
+    if not stride:
+        # Packed rows; only derivable for 8-bit-per-band layouts
+        if rawmode not in ['L', 'LA', 'RGB', 'RGBA', 'RGBX', 'CMYK', 'YCbCr']:
+            return None
+        stride = img.width * Image.getmodebands(rawmode)
+
+    if offset + img.height * stride > file_size:
+        return None
+    return offset, rawmode, stride, ystep
+
+
+def _prepare_strip(strip: Image.Image, out_mode: str, flatten: bool) -> Image.Image:
+    """Convert one strip to the output mode, flattening transparency onto white."""
+    if flatten and (strip.mode in ['RGBA', 'LA', 'PA'] or 'transparency' in strip.info):
+        background = Image.new('RGBA', strip.size, (255, 255, 255, 255))
+        background.alpha_composite(strip.convert('RGBA'))
+        strip = background
+    if strip.mode == 'P':
+        strip = strip.convert('RGBA' if 'transparency' in strip.info else 'RGB')
+    return strip if strip.mode == out_mode else strip.convert(out_mode)
+
+
+def _write_png_strips(strips, output_path: str, size: tuple, mode: str, compress_level: int):
+    """Stream strips into a PNG: one zlib stream across all rows, emitted as IDAT chunks."""
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+    width, height = size
+    color_type = {'L': 0, 'LA': 4, 'RGB': 2, 'RGBA': 6}[mode]
+    row_bytes = width * len(mode)
+    compressor = zlib.compressobj(compress_level)
+
+    with open(output_path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0)))
+        for strip in strips:
+            data = memoryview(strip.tobytes())
+            # Filter type 0 per row; adaptive filtering would need the whole row history
+            rows = b''.join(b'\x00' + data[i:i + row_bytes] for i in range(0, len(data), row_bytes))
+            compressed = compressor.compress(rows)
+            if compressed:
+                f.write(chunk(b'IDAT', compressed))
+        f.write(chunk(b'IDAT', compressor.flush()))
+        f.write(chunk(b'IEND', b''))
+
+
+def _write_tiff_strips(strips, output_path: str, size: tuple, mode: str, compress_level: int):
+    """
+    Stream strips into a deflate-compressed, strip-based TIFF. Strips are
+    compressed independently, so only one is in memory at a time; BigTIFF
+    is used when the raw data could push offsets past 4 GB.
+    """
+    width, height = size
+    samples = len(mode)
+    row_bytes = width * samples
+    rows_per_strip = max(1, TIFF_STRIP_BYTES // row_bytes)
+    strip_bytes = rows_per_strip * row_bytes
+    big = height * row_bytes > 0xF0000000
+    offset_format = '<Q' if big else '<I'
+    slot = 8 if big else 4
+    offsets, counts = [], []
+
+    with open(output_path, 'wb') as f:
+        f.write(b'II+\x00\x08\x00\x00\x00' + bytes(8) if big else b'II*\x00' + bytes(4))
+
+        def write_strip(data):
+            compressed = zlib.compress(data, compress_level)
+            offsets.append(f.tell())
+            counts.append(len(compressed))
+            f.write(compressed)
+
+        pending = bytearray()
+        for strip in strips:
+            pending += strip.tobytes()
+            while len(pending) >= strip_bytes:
+                write_strip(bytes(pending[:strip_bytes]))
+                del pending[:strip_bytes]
+        if pending:
+            write_strip(bytes(pending))
+
+        def entry(tag, type_, values):
+            type_format = {3: 'H', 4: 'I', 16: 'Q'}[type_]
+            data = struct.pack(f'<{len(values)}{type_format}', *values)
+            if len(data) > slot:
+                if f.tell() % 2:
+                    f.write(b'\x00')
+                position = f.tell()
+                f.write(data)
+                data = struct.pack(offset_format, position)
+            return struct.pack('<HH', tag, type_) + struct.pack(offset_format, len(values)) + data.ljust(slot, b'\x00')
+
+        offset_type = 16 if big else 4
+        entries = [
+            entry(256, 4, [width]),
+            entry(257, 4, [height]),
+            entry(258, 3, [8] * samples),
+            entry(259, 3, [8]),                             # Adobe deflate
+            entry(262, 3, [1 if mode[0] == 'L' else 2]),    # BlackIsZero / RGB
+            entry(273, offset_type, offsets),
+            entry(277, 3, [samples]),
+            entry(278, 4, [rows_per_strip]),
+            entry(279, offset_type, counts),
+            entry(284, 3, [1]),
+        ]
+        if mode.endswith('A'):
+            entries.append(entry(338, 3, [2]))              # unassociated alpha
+
+        if f.tell() % 2:
+            f.write(b'\x00')
+        ifd_offset = f.tell()
+        f.write(struct.pack('<Q' if big else '<H', len(entries)) + b''.join(entries) + bytes(slot))
+        f.seek(8 if big else 4)
+        f.write(struct.pack(offset_format, ifd_offset))
+
+
+def _convert_animation(img: Image.Image, output_path: str, output_filename: str, target_format: str,
+                       quality: str, max_size: int = None) -> dict:
+    """
+    Convert an animated image one frame at a time.
+    Each frame is decoded, converted, encoded and written before the next
+    one is read, so peak memory stays at a couple of frames however long
+    the animation is.
+    """
+    frames = _iter_frames(img, max_size)
+    # None when the source has no loop block, i.e. plays once
+    loop = img.info.get('loop')
+
+    if target_format == 'gif':
+        _write_animated_gif(frames, output_path, loop)
+    else:
+        quality_value = 95 if quality == 'high' else 80
+        _write_animated_webp(frames, output_path, loop, quality_value, 6 if quality == 'high' else 4)
+
+    return {"success": True, "output_path": output_path, "filename": output_filename}
+
+
+def _iter_frames(img: Image.Image, max_size: int = None):
+    """
+    Yield (frame, duration, disposal) for every frame of an animated image.
+    Pillow keeps only the current composited canvas, so frames come out
+    fully rendered and only one is held at a time.
+    """
+    has_alpha = img.mode in ['RGBA', 'LA', 'PA'] or 'transparency' in img.info
+    for index in range(img.n_frames):
+        img.seek(index)
+        frame = _decode_reduced(img.convert('RGBA' if has_alpha else 'RGB'), max_size)
+        duration = img.info.get('duration') or DEFAULT_FRAME_DURATION
+        # Frames are full canvases; with transparency the previous one has to be
+        # cleared or it would show through
+        disposal = 2 if has_alpha else getattr(img, 'disposal_method', 1)
+        yield frame, duration, disposal
+
+
+def _write_animated_gif(frames, output_path: str, loop: int = None):
+    """
+    Stream frames into a GIF. Each frame is encoded as a standalone GIF by
+    Pillow and its image block is spliced in with its palette as a local
+    color table, so no frame list is ever built. The NETSCAPE loop block is
+    only written when `loop` is given; without it the GIF plays once.
+    """
+    with open(output_path, 'wb') as f:
+        for index, (frame, duration, disposal) in enumerate(frames):
+            buffer = io.BytesIO()
+            frame.save(buffer, 'GIF')
+            data = buffer.getvalue()
+
+            packed = data[10]
+            table_size = 3 * (2 << (packed & 0x07)) if packed & 0x80 else 0
+            color_table = data[13:13 + table_size]
+
+            # Skip the frame's own extensions, keeping its transparency index
+            pos = 13 + table_size
+            transparency = None
+            while data[pos] == 0x21:
+                if data[pos + 1] == 0xF9 and data[pos + 3] & 0x01:
+                    transparency = data[pos + 6]
+                pos += 2
+                while data[pos]:
+                    pos += data[pos] + 1
+                pos += 1
+            descriptor, image_data = data[pos:pos + 10], data[pos + 10:-1]
+
+            if index == 0:
+                # Header, screen descriptor and global table come from the first frame
+                f.write(data[:13 + table_size])
+                if loop is not None:
+                    f.write(b'!\xff\x0bNETSCAPE2.0\x03\x01' + loop.to_bytes(2, 'little') + b'\x00')
+            elif table_size and not descriptor[9] & 0x80:
+                descriptor = descriptor[:9] + bytes([(descriptor[9] & 0x60) | 0x80 | (packed & 0x07)])
+                image_data = color_table + image_data
+
+            flags = (disposal << 2) | (1 if transparency is not None else 0)
+            f.write(b'!\xf9\x04' + bytes([flags]) + (round(duration / 10)).to_bytes(2, 'little')
+                    + bytes([transparency or 0, 0]))
+            f.write(descriptor + image_data)
+        f.write(b';')
+
+
+def _write_animated_webp(frames, output_path: str, loop: int, quality_value: int, method: int):
+    """
+    Stream frames into an animated WebP (RIFF with ANMF chunks). Frames are
+    encoded one by one as still WebPs and their bitstream chunks wrapped in
+    ANMF; the RIFF size is patched in at the end. WebP always carries a loop
+    count (0 = forever), so a play-once source (`loop` None) is written as 1.
+    """
+    def chunk(fourcc: bytes, payload: bytes) -> bytes:
+        return fourcc + len(payload).to_bytes(4, 'little') + payload + (b'\x00' if len(payload) & 1 else b'')
+
+    def u24(value: int) -> bytes:
+        return min(value, 0xFFFFFF).to_bytes(3, 'little')
+
+    with open(output_path, 'wb') as f:
+        f.write(b'RIFF\x00\x00\x00\x00WEBP')
+        for index, (frame, duration, disposal) in enumerate(frames):
+            width, height = frame.size
+            if index == 0:
+                flags = 0x02 | (0x10 if frame.mode == 'RGBA' else 0)  # animation, alpha
+                f.write(chunk(b'VP8X', bytes([flags, 0, 0, 0]) + u24(width - 1) + u24(height - 1)))
+                loop_count = 1 if loop is None else loop
+                f.write(chunk(b'ANIM', bytes(4) + loop_count.to_bytes(2, 'little')))
+
+            buffer = io.BytesIO()
+            frame.save(buffer, 'WEBP', quality=quality_value, method=method)
+            data = buffer.getvalue()
+
+            # Keep only the bitstream chunks of the still image
+            bitstream = b''
+            pos = 12
+            while pos < len(data):
+                size = int.from_bytes(data[pos + 4:pos + 8], 'little')
+                end = pos + 8 + size + (size & 1)
+                if data[pos:pos + 4] in [b'ALPH', b'VP8 ', b'VP8L']:
+                    bitstream += data[pos:end]
+                pos = end
+
+            # Full-canvas frames: never blend, dispose to background if the source did
+            frame_flags = 0x02 | (0x01 if disposal == 2 else 0)
+            header = u24(0) + u24(0) + u24(width - 1) + u24(height - 1) + u24(duration) + bytes([frame_flags])
+            f.write(chunk(b'ANMF', header + bitstream))
+
+        riff_size = f.tell() - 8
+        f.seek(4)
+        f.write(riff_size.to_bytes(4, 'little'))
+
+
+def _convert_svg(input_path: str, output_path: str, output_filename: str, target_format: str,
+                 quality: str = "high", max_size: int = None, dpi: int = None) -> dict:
+    """Convert SVG to PDF (vector) or to any raster target via an in-memory render."""
     try:
         import cairosvg
     except ImportError:
         return {"success": False, "error": "cairosvg yüklü değil. 'pip install cairosvg' çalıştırın."}
     
     try:
-        if target_format == 'png':
-            cairosvg.svg2png(url=input_path, write_to=output_path, scale=2.0)
-        elif target_format == 'pdf':
-            cairosvg.svg2pdf(url=input_path, write_to=output_path)
-        elif target_format in ['jpg', 'jpeg']:
-            # SVG -> PNG -> JPG
-            import io
-            png_data = cairosvg.svg2png(url=input_path, scale=2.0)
-            with Image.open(io.BytesIO(png_data)) as img:
-                rgb_img = img.convert('RGB')
-                rgb_img.save(output_path, 'JPEG', quality=95)
-        else:
-            return {"success": False, "error": f"SVG sadece PNG, PDF veya JPG'ye dönüştürülebilir."}
-            
-        return {"success": True, "output_path": output_path, "filename": output_filename}
+        if target_format == 'pdf':
+            tree, lock = _load_svg_tree(input_path)
+            with lock:
+                surface = cairosvg.surface.PDFSurface(tree, output_path, 96)
+                surface.finish()
+            return {"success": True, "output_path": output_path, "filename": output_filename}
+
+        img = _render_svg(input_path, dpi, _decode_bound(target_format, max_size))
+        return _save_image(img, output_path, output_filename, target_format, quality)
         
     except Exception as e:
         return {"success": False, "error": f"SVG dönüşüm hatası: {str(e)}"}
+
+
+def _load_svg_tree(input_path: str):
+    """
+    Parsed cairosvg tree for a file, cached by path, mtime and size.
+    Rendering writes a few attributes onto the tree, so each entry comes
+    with its own lock.
+    """
+    from cairosvg.parser import Tree
+
+    stat = os.stat(input_path)
+    key = (os.path.abspath(input_path), stat.st_mtime_ns, stat.st_size)
+    with _svg_cache_lock:
+        if key in _svg_cache:
+            _svg_cache.move_to_end(key)
+            return _svg_cache[key]
+
+    entry = (Tree(url=input_path), threading.Lock())
+    with _svg_cache_lock:
+        _svg_cache[key] = entry
+        while len(_svg_cache) > SVG_CACHE_SIZE:
+            _svg_cache.popitem(last=False)
+    return entry
+
+
+def _render_svg(input_path: str, dpi: int = None, max_size: int = None) -> Image.Image:
+    """
+    Render an SVG into cairo's in-memory ARGB32 surface and hand the pixel
+    buffer to Pillow directly (no PNG encode/decode in between). `dpi`
+    scales the drawing; `max_size` fits the longest edge instead.
+    """
+    from cairosvg.surface import PNGSurface
+
+    class _SvgSize(Exception):
+        pass
+
+    class _SizeProbe(PNGSurface):
+        def _create_surface(self, width, height):
+            raise _SvgSize(width, height)
+
+    tree, lock = _load_svg_tree(input_path)
+    with lock:
+        size_kwargs = {'scale': (dpi or SVG_DEFAULT_DPI) / 96}
+        if max_size:
+            # Natural size without drawing anything, to pick the longest edge
+            try:
+                _SizeProbe(tree, None, 96)
+            except _SvgSize as e:
+                width, height = e.args
+                size_kwargs = {'output_width': max_size} if width >= height else {'output_height': max_size}
+
+        surface = PNGSurface(tree, None, 96, **size_kwargs)
+
+    surface.cairo.flush()
+    # cairo stores premultiplied native-endian ARGB, i.e. BGRa bytes on little-endian hosts
+    return Image.frombuffer('RGBA', (surface.width, surface.height), surface.cairo.get_data(),
+                            'raw', 'BGRa', surface.cairo.get_stride(), 1)
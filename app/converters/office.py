@@ -0,0 +1,442 @@
+"""
+LibreOffice Integration
+Office document → PDF through a pool of long-lived headless LibreOffice
+instances driven over UNO. Each instance has its own user profile, so
+conversions run in parallel without profile lock collisions.
+Without the UNO bindings, soffice is called once per document, still
+with a pooled private profile.
+"""
+import os
+import time
+import asyncio
+import queue
+import shutil
+import socket
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    HAS_UNO = True
+except ImportError:
+    HAS_UNO = False
+
+OFFICE_WORKERS = int(os.environ.get('UC_OFFICE_WORKERS', 0)) or min(2, os.cpu_count() or 1)
+# Seconds a single conversion may take before its instance is killed and restarted
+OFFICE_TIMEOUT = int(os.environ.get('UC_OFFICE_TIMEOUT', 180))
+OFFICE_START_TIMEOUT = 60
+OFFICE_PROBE_TIMEOUT = 10
+# Seconds a conversion waits for a free instance
+OFFICE_QUEUE_TIMEOUT = 600
+# Documents per soffice call in batch mode, and the time budget per document
+OFFICE_BATCH_SIZE = int(os.environ.get('UC_OFFICE_BATCH_SIZE', 50))
+OFFICE_BATCH_FILE_TIMEOUT = 60
+
+SOFFICE_PATHS = [
+    r"C:\Program Files\LibreOffice\program\soffice.exe",
+    r"C:\Program Files (x86)\LibreOffice\program\soffice.exe",
+    "soffice",  # If in PATH
+    "libreoffice",
+    "/usr/bin/soffice",  # Linux
+    "/Applications/LibreOffice.app/Contents/MacOS/soffice"  # macOS
+]
+
+# First matching document service decides the PDF export filter
+PDF_EXPORT_FILTERS = [
+    ('com.sun.star.presentation.PresentationDocument', 'impress_pdf_Export'),
+    ('com.sun.star.drawing.DrawingDocument', 'draw_pdf_Export'),
+    ('com.sun.star.sheet.SpreadsheetDocument', 'calc_pdf_Export'),
+    ('com.sun.star.text.TextDocument', 'writer_pdf_Export'),
+]
+
+_pool = None
+_profiles = None
+_pool_lock = threading.Lock()
+
+
+def find_soffice() -> str | None:
+    """Return the LibreOffice executable, or None if it is not installed."""
+    for path in SOFFICE_PATHS:
+        if os.path.exists(path):
+            return path
+        found = shutil.which(path)
+        if found:
+            return found
+    return None
+
+
+def office_to_pdf(input_path: str, output_path: str, timeout: int = OFFICE_TIMEOUT):
+    """
+    Convert an office document to PDF at output_path with LibreOffice.
+    Raises RuntimeError when LibreOffice is missing or the conversion fails.
+    """
+    soffice = find_soffice()
+    if not soffice:
+        raise RuntimeError("LibreOffice not found")
+
+    if HAS_UNO:
+        _get_pool(soffice).convert(input_path, output_path, timeout)
+    else:
+        _convert_with_subprocess(soffice, input_path, output_path, timeout)
+
+
+async def convert_office_batch(input_paths: list, output_dir: str) -> list:
+    """Convert many office documents to PDF; returns one result dict per input, in order."""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, _convert_office_batch, input_paths, output_dir)
+
+
+def _convert_office_batch(input_paths: list, output_dir: str) -> list:
+    soffice = find_soffice()
+    if not soffice:
+        return [{"success": False, "error": "LibreOffice not found"} for _ in input_paths]
+
+    # a.docx and a.pptx in one batch must not both become a.pdf
+    jobs, used = [], set()
+    for input_path in input_paths:
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        output_filename, suffix = f"{stem}.pdf", 1
+        while output_filename in used:
+            suffix += 1
+            output_filename = f"{stem}_{suffix}.pdf"
+        used.add(output_filename)
+        jobs.append((input_path, os.path.join(output_dir, output_filename)))
+
+    results = []
+    for (input_path, output_path), error in zip(jobs, office_batch_to_pdf(soffice, jobs)):
+        if error:
+            results.append({"success": False, "error": error})
+        else:
+            results.append({"success": True, "output_path": output_path, "filename": os.path.basename(output_path)})
+    return results
+
+
+def office_batch_to_pdf(soffice: str, jobs: list) -> list:
+    """
+    Convert (input_path, output_path) jobs to PDF; returns an error message
+    or None per job. With UNO the jobs are spread over the instance pool;
+    otherwise each batch of up to OFFICE_BATCH_SIZE documents is one soffice
+    call, and documents a batch failed to produce are retried one by one so
+    a single bad file cannot fail the others.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def run(job):
+        try:
+            office_to_pdf(*job)
+            return None
+        except Exception as e:
+            return str(e)
+
+    if HAS_UNO:
+        with ThreadPoolExecutor(max_workers=OFFICE_WORKERS) as pool:
+            return list(pool.map(run, jobs))
+
+    def run_batch(batch):
+        return _convert_batch_with_subprocess(soffice, [jobs[index] for index in batch])
+
+    batches = _split_batches(jobs)
+    errors = [None] * len(jobs)
+    with ThreadPoolExecutor(max_workers=OFFICE_WORKERS) as pool:
+        produced = list(pool.map(run_batch, batches))
+        retry = [index for batch, done in zip(batches, produced) for index, ok in zip(batch, done) if not ok]
+        for index, error in zip(retry, pool.map(run, [jobs[index] for index in retry])):
+            errors[index] = error
+    return errors
+
+
+def _split_batches(jobs: list) -> list:
+    """Group job indices into batches of OFFICE_BATCH_SIZE with unique input names per batch."""
+    batches = []
+    for index in range(len(jobs)):
+        name = os.path.splitext(os.path.basename(jobs[index][0]))[0]
+        for batch, names in batches:
+            if len(batch) < OFFICE_BATCH_SIZE and name not in names:
+                batch.append(index)
+                names.add(name)
+                break
+        else:
+            batches.append(([index], {name}))
+    return [batch for batch, _ in batches]
+
+
+def _convert_batch_with_subprocess(soffice: str, batch: list) -> list:
+    """One soffice call for several documents; returns which outputs were produced."""
+    profiles = _get_profiles()
+    try:
+        profile_dir = profiles.get(timeout=OFFICE_QUEUE_TIMEOUT)
+    except queue.Empty:
+        return [False] * len(batch)
+
+    produced = []
+    try:
+        with tempfile.TemporaryDirectory() as out_dir:
+            try:
+                subprocess.run([
+                    soffice,
+                    "--headless",
+                    _profile_url(profile_dir),
+                    "--convert-to", "pdf",
+                    "--outdir", out_dir,
+                    *[input_path for input_path, _ in batch]
+                ], capture_output=True, text=True, timeout=OFFICE_BATCH_FILE_TIMEOUT * len(batch))
+            except subprocess.TimeoutExpired:
+                print(f"[Office] Batch of {len(batch)} timed out; retrying unconverted files one by one")
+
+            # Whatever was written before a crash or timeout is kept
+            for input_path, output_path in batch:
+                result = os.path.join(out_dir, os.path.splitext(os.path.basename(input_path))[0] + ".pdf")
+                if os.path.exists(result):
+                    shutil.move(result, output_path)
+                    produced.append(True)
+                else:
+                    produced.append(False)
+    finally:
+        profiles.put(profile_dir)
+    return produced
+
+
+def start_office_pool():
+    """Start the LibreOffice instances ahead of the first conversion (no-op without UNO)."""
+    soffice = find_soffice()
+    if HAS_UNO and soffice:
+        _get_pool(soffice).warm()
+
+
+def shutdown_office_pool():
+    """Terminate pooled instances and remove their profiles."""
+    global _pool, _profiles
+    with _pool_lock:
+        pool, _pool = _pool, None
+        profiles, _profiles = _profiles, None
+    if pool:
+        pool.shutdown()
+    if profiles:
+        while not profiles.empty():
+            shutil.rmtree(profiles.get_nowait(), ignore_errors=True)
+
+
+def _get_pool(soffice: str) -> "OfficePool":
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OfficePool(soffice, OFFICE_WORKERS)
+        return _pool
+
+
+def _profile_url(profile_dir: str) -> str:
+    return f"-env:UserInstallation={Path(profile_dir).as_uri()}"
+
+
+class OfficePool:
+    """Fixed set of LibreOffice instances handed out through a queue."""
+
+    def __init__(self, soffice: str, size: int):
+        self._instances = [_OfficeInstance(soffice, index) for index in range(size)]
+        self._idle = queue.Queue()
+        for instance in self._instances:
+            self._idle.put(instance)
+
+    def convert(self, input_path: str, output_path: str, timeout: int):
+        try:
+            instance = self._idle.get(timeout=OFFICE_QUEUE_TIMEOUT)
+        except queue.Empty:
+            raise RuntimeError("All LibreOffice workers are busy, try again later")
+        try:
+            instance.convert(input_path, output_path, timeout)
+        finally:
+            self._idle.put(instance)
+
+    def warm(self):
+        """Start idle instances in the background."""
+        def start(instance):
+            try:
+                instance.ensure_running()
+            except Exception as e:
+                print(f"[Office] Worker {instance.index} failed to start: {e}")
+            finally:
+                self._idle.put(instance)
+
+        for _ in range(len(self._instances)):
+            try:
+                instance = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            threading.Thread(target=start, args=(instance,), daemon=True).start()
+
+    def shutdown(self):
+        for instance in self._instances:
+            instance.stop()
+            shutil.rmtree(instance.profile_dir, ignore_errors=True)
+
+
+class _OfficeInstance:
+    """One headless soffice process with a private profile and UNO connection."""
+
+    def __init__(self, soffice: str, index: int):
+        self.soffice = soffice
+        self.index = index
+        self.profile_dir = tempfile.mkdtemp(prefix=f"uc_office_{index}_")
+        self.process = None
+        self.desktop = None
+        self.port = None
+
+    def ensure_running(self):
+        """Health check: restart unless the process is alive and answers over UNO."""
+        if self.process is not None and self.process.poll() is None and self.desktop is not None:
+            # An instance that does not answer in time counts as hung
+            probe = threading.Timer(OFFICE_PROBE_TIMEOUT, self._kill)
+            probe.start()
+            try:
+                self.desktop.getComponents()
+                return
+            except Exception:
+                pass
+            finally:
+                probe.cancel()
+        self.stop()
+        self._start()
+
+    def _start(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.port = sock.getsockname()[1]
+        connection = f"socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext"
+
+        self.process = subprocess.Popen([
+            self.soffice,
+            "--headless", "--invisible", "--nologo", "--nodefault", "--norestore", "--nolockcheck",
+            _profile_url(self.profile_dir),
+            f"--accept={connection}"
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+        deadline = time.monotonic() + OFFICE_START_TIMEOUT
+        while True:
+            try:
+                context = resolver.resolve(f"uno:{connection}")
+                break
+            except Exception:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError("LibreOffice did not start")
+                time.sleep(0.25)
+        self.desktop = context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+
+    def convert(self, input_path: str, output_path: str, timeout: int):
+        self.ensure_running()
+
+        # A hung conversion blocks the UNO call; killing the process makes it
+        # return, and the next ensure_running() starts a fresh instance
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            self._kill()
+
+        watchdog = threading.Timer(timeout, kill)
+        watchdog.start()
+        document = None
+        try:
+            document = self.desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(os.path.abspath(input_path)), "_blank", 0,
+                _properties(Hidden=True, ReadOnly=True, UpdateDocMode=0)
+            )
+            if document is None:
+                raise RuntimeError("LibreOffice could not open the document")
+            export_filter = next(
+                (name for service, name in PDF_EXPORT_FILTERS if document.supportsService(service)),
+                'writer_pdf_Export'
+            )
+            document.storeToURL(
+                uno.systemPathToFileUrl(os.path.abspath(output_path)),
+                _properties(FilterName=export_filter, Overwrite=True)
+            )
+        except Exception as e:
+            if timed_out.is_set():
+                raise RuntimeError(f"LibreOffice timed out after {timeout}s")
+            raise RuntimeError(f"LibreOffice conversion failed: {e}")
+        finally:
+            watchdog.cancel()
+            if document is not None and not timed_out.is_set():
+                try:
+                    document.close(True)
+                except Exception:
+                    pass
+
+    def _kill(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+        self.desktop = None
+
+    def stop(self):
+        terminated = False
+        if self.desktop is not None:
+            try:
+                terminated = self.desktop.terminate()
+            except Exception:
+                pass
+            self.desktop = None
+        if self.process is not None:
+            if not terminated and self.process.poll() is None:
+                self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+
+
+def _properties(**values) -> tuple:
+    properties = []
+    for name, value in values.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        properties.append(prop)
+    return tuple(properties)
+
+
+def _convert_with_subprocess(soffice: str, input_path: str, output_path: str, timeout: int):
+    """One soffice call per document, using a private profile taken from a small pool."""
+    profiles = _get_profiles()
+    try:
+        profile_dir = profiles.get(timeout=OFFICE_QUEUE_TIMEOUT)
+    except queue.Empty:
+        raise RuntimeError("All LibreOffice workers are busy, try again later")
+
+    try:
+        # Private output directory: documents with the same name may convert concurrently
+        with tempfile.TemporaryDirectory() as out_dir:
+            result = subprocess.run([
+                soffice,
+                "--headless",
+                _profile_url(profile_dir),
+                "--convert-to", "pdf",
+                "--outdir", out_dir,
+                input_path
+            ], capture_output=True, text=True, timeout=timeout)
+
+            produced = os.path.join(out_dir, os.path.splitext(os.path.basename(input_path))[0] + ".pdf")
+            if not os.path.exists(produced):
+                raise RuntimeError(result.stderr.strip() or "LibreOffice produced no output")
+            shutil.move(produced, output_path)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"LibreOffice timed out after {timeout}s")
+    finally:
+        profiles.put(profile_dir)
+
+
+def _get_profiles() -> queue.Queue:
+    global _profiles
+    with _pool_lock:
+        if _profiles is None:
+            _profiles = queue.Queue()
+            for index in range(OFFICE_WORKERS):
+                _profiles.put(tempfile.mkdtemp(prefix=f"uc_office_{index}_"))
+        return _profiles
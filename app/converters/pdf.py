@@ -1,85 +1,199 @@
 """
 PDF Converter - Enhanced Version
-Converts PDF files to DOCX (with formatting), TXT, HTML, MD, RTF, and images.
+Converts PDF files to DOCX (with formatting), TXT, HTML, MD, RTF, images and optimized PDF.
 Uses pdf2docx for high-quality DOCX conversion.
 """
 import os
+import shutil
 import asyncio
-
-
-async def convert_pdf(input_path: str, output_dir: str, target_format: str) -> dict:
-    """PDF converter supporting multiple output formats with formatting preservation."""
+import hashlib
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+
+# Raster targets; PNG/JPG are written by PyMuPDF, the rest go through Pillow
+PDF_IMAGE_FORMATS = ['png', 'jpg', 'jpeg', 'webp', 'avif', 'tiff', 'tif', 'bmp', 'gif', 'ico', 'heic', 'heif']
+PDF_MULTIPAGE_FORMATS = ['tiff', 'tif', 'webp']
+
+PDF_TEXT_FORMATS = {
+    'txt': 'text/plain; charset=utf-8',
+    'html': 'text/html; charset=utf-8',
+    'md': 'text/markdown; charset=utf-8',
+    'rtf': 'application/rtf',
+}
+
+
+async def convert_pdf(input_path: str, output_dir: str, target_format: str, pages: str = None,
+                      dpi: int = None, quality: str = "high", multipage: bool = False) -> dict:
+    """
+    PDF converter supporting multiple output formats with formatting preservation.
+    pages selects 1-based page ranges ("1-3,10,20-"); dpi sets the image resolution;
+    multipage writes all pages into one TIFF or animated WebP.
+    """
     loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, _process_pdf, input_path, output_dir, target_format)
+    return await loop.run_in_executor(None, _process_pdf, input_path, output_dir, target_format, pages, dpi,
+                                      quality, multipage)
 
 
-def _process_pdf(input_path: str, output_dir: str, target_format: str) -> dict:
+def _process_pdf(input_path: str, output_dir: str, target_format: str, pages: str = None,
+                 dpi: int = None, quality: str = "high", multipage: bool = False, stem: str = None,
+                 unit: str = "sayfa") -> dict:
+    """
+    ``stem`` and ``unit`` name page images and their note; the planner passes the original
+    document's values (e.g. ``{name}_slide`` / "slayt") when the PDF is an intermediate.
+    """
     try:
         filename = os.path.basename(input_path)
         name, ext = os.path.splitext(filename)
         output_filename = f"{name}.{target_format}"
         output_path = os.path.join(output_dir, output_filename)
 
-        if target_format in ['docx', 'doc']:
-            return _pdf_to_docx(input_path, output_path, output_filename)
-        elif target_format == 'txt':
-            return _pdf_to_txt(input_path, output_path, output_filename)
-        elif target_format == 'html':
-            return _pdf_to_html(input_path, output_path, output_filename, name)
-        elif target_format == 'md':
-            return _pdf_to_md(input_path, output_path, output_filename, name)
-        elif target_format == 'rtf':
-            return _pdf_to_rtf(input_path, output_path, output_filename)
-        elif target_format in ['png', 'jpg', 'jpeg']:
-            return _pdf_to_images(input_path, output_dir, target_format, name)
+        if target_format == 'pdf':
+            return _optimize_pdf(input_path, output_path, output_filename, pages, dpi, quality)
+        elif target_format in ['docx', 'doc']:
+            return _pdf_to_docx(input_path, output_path, output_filename, pages)
+        elif target_format in PDF_TEXT_FORMATS:
+            return _pdf_to_text(input_path, output_path, output_filename, target_format, name, pages)
+        elif target_format in PDF_IMAGE_FORMATS:
+            if multipage:
+                return pdf_to_multipage_image(input_path, output_path, output_filename, target_format,
+                                              pages, dpi, quality)
+            return _pdf_to_images(input_path, output_dir, target_format, stem or f"{name}_page", pages, dpi,
+                                  quality, unit)
         else:
             return {"success": False, "error": f"Unsupported target format for PDF: {target_format}"}
 
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
     except Exception as e:
         return {"success": False, "error": f"PDF conversion error: {str(e)}"}
 
 
-def _pdf_to_docx(input_path: str, output_path: str, output_filename: str) -> dict:
+def parse_page_ranges(spec: str, page_count: int) -> list:
+    """
+    Parse 1-based page ranges such as "1-3,10,20-" into sorted 0-based
+    page indices. None or an empty spec selects every page.
+    """
+    if not spec or not spec.strip():
+        return list(range(page_count))
+
+    selected = set()
+    for part in spec.replace(' ', '').split(','):
+        if not part:
+            continue
+        first, sep, last = part.partition('-')
+        try:
+            start = int(first) if first else 1
+            end = (int(last) if last else page_count) if sep else start
+        except ValueError:
+            raise ValueError(f"Invalid page range: '{part}'")
+        if start < 1 or end < start:
+            raise ValueError(f"Invalid page range: '{part}'")
+        selected.update(range(start - 1, min(end, page_count)))
+
+    if not selected:
+        raise ValueError(f"No pages selected: '{spec}' (document has {page_count} pages)")
+    return sorted(selected)
+
+
+# Page count from which pdf2docx parsing is spread over worker processes
+DOCX_PARALLEL_MIN_PAGES = int(os.environ.get('UC_DOCX_PARALLEL_MIN_PAGES', 24))
+DOCX_WORKERS = int(os.environ.get('UC_DOCX_WORKERS', 0)) or os.cpu_count() or 1
+
+
+def _pdf_to_docx(input_path: str, output_path: str, output_filename: str, pages: str = None) -> dict:
     """Convert PDF to DOCX with formatting preservation using pdf2docx."""
     try:
         from pdf2docx import Converter
-        
-        cv = Converter(input_path)
-        cv.convert(output_path, start=0, end=None)
-        cv.close()
+        import fitz  # PyMuPDF, required by pdf2docx
+    except ImportError:
+        return {"success": False, "error": "pdf2docx not installed. Run 'pip install pdf2docx'"}
+
+    with fitz.open(input_path) as pdf_doc:
+        page_indices = parse_page_ranges(pages, len(pdf_doc))
+
+    try:
+        workers = min(DOCX_WORKERS, len(page_indices))
+        if workers > 1 and len(page_indices) >= DOCX_PARALLEL_MIN_PAGES:
+            _pdf_to_docx_parallel(input_path, output_path, page_indices, workers)
+        else:
+            cv = Converter(input_path)
+            cv.convert(output_path, pages=page_indices)
+            cv.close()
         
         if os.path.exists(output_path):
             return {"success": True, "output_path": output_path, "filename": output_filename}
         return {"success": False, "error": "DOCX file was not created"}
         
-    except ImportError:
-        return {"success": False, "error": "pdf2docx not installed. Run 'pip install pdf2docx'"}
     except Exception as e:
         # Fallback to basic text extraction if pdf2docx fails
-        return _pdf_to_docx_fallback(input_path, output_path, output_filename, str(e))
+        return _pdf_to_docx_fallback(input_path, output_path, output_filename, str(e), pages)
+
+
+def _pdf_to_docx_parallel(input_path: str, output_path: str, page_indices: list, workers: int):
+    """
+    Parse contiguous chunks of the page selection in worker processes, then
+    restore the parsed pages into one Converter and build the DOCX.
+    pdf2docx's own multi_processing option is not used: it only takes
+    start/end ranges and writes its intermediate JSON to the working directory.
+    """
+    import tempfile
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from pdf2docx import Converter
+
+    bounds = [len(page_indices) * i // workers for i in range(workers + 1)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_paths = [os.path.join(tmp_dir, f"pages-{i}.json") for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [
+                pool.submit(_parse_docx_pages, input_path, page_indices[start:end], json_path)
+                for start, end, json_path in zip(bounds, bounds[1:], json_paths)
+            ]
+            for future in futures:
+                future.result()
 
+        cv = Converter(input_path)
+        try:
+            for json_path in json_paths:
+                cv.deserialize(json_path)
+            cv.make_docx(output_path, **cv.default_settings)
+        finally:
+            cv.close()
+
+
+def _parse_docx_pages(input_path: str, page_indices: list, json_path: str):
+    """Worker: parse the given pages with pdf2docx and serialize them to JSON."""
+    from pdf2docx import Converter
 
-def _pdf_to_docx_fallback(input_path: str, output_path: str, output_filename: str, original_error: str) -> dict:
-    """Fallback: Basic PDF to DOCX conversion using PyPDF2 + python-docx."""
+    cv = Converter(input_path)
+    try:
+        settings = cv.default_settings
+        cv.load_pages(pages=page_indices).parse_document(**settings).parse_pages(**settings).serialize(json_path)
+    finally:
+        cv.close()
+
+
+def _pdf_to_docx_fallback(input_path: str, output_path: str, output_filename: str, original_error: str,
+                          pages: str = None) -> dict:
+    """Fallback: plain DOCX from the shared text engine (headings and paragraphs only)."""
     try:
-        import PyPDF2
         from docx import Document
         
-        text_content = ""
-        with open(input_path, 'rb') as pdf_file:
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_content += page_text + "\n\n"
+        doc = Document()
+        has_text = False
+        for _, blocks in _iter_pdf_pages(input_path, pages):
+            for block in blocks:
+                text = " ".join(block["lines"])
+                if block["type"] == "heading":
+                    doc.add_heading(text, level=block["level"])
+                else:
+                    doc.add_paragraph(text)
+                has_text = True
         
-        if not text_content.strip():
+        if not has_text:
             return {"success": False, "error": f"Could not extract text from PDF. Original error: {original_error}"}
         
-        doc = Document()
-        for para in text_content.split('\n'):
-            if para.strip():
-                doc.add_paragraph(para)
         doc.save(output_path)
         
         return {
@@ -92,55 +206,279 @@ def _pdf_to_docx_fallback(input_path: str, output_path: str, output_filename: st
         return {"success": False, "error": f"PDF conversion failed: {str(e)}"}
 
 
-def _pdf_to_txt(input_path: str, output_path: str, output_filename: str) -> dict:
-    """Extract text from PDF."""
+# Images shown above OPTIMIZE_DPI * OPTIMIZE_DPI_SLACK are downsampled to OPTIMIZE_DPI
+OPTIMIZE_DPI = 150
+OPTIMIZE_DPI_SLACK = 1.2
+
+
+def _optimize_pdf(input_path: str, output_path: str, output_filename: str, pages: str = None,
+                  dpi: int = None, quality: str = "high") -> dict:
+    """
+    PDF→PDF optimization: downsample and recompress embedded images page by
+    page, subset fonts, then save with garbage collection and deflate.
+    """
+    import time
     try:
-        import PyPDF2
+        import fitz  # PyMuPDF
     except ImportError:
-        return {"success": False, "error": "PyPDF2 not installed. Run 'pip install PyPDF2'"}
+        return {"success": False, "error": "PyMuPDF yüklü değil. 'pip install PyMuPDF' çalıştırın."}
+
+    start = time.perf_counter()
+    original_size = os.path.getsize(input_path)
+    target_dpi = dpi or OPTIMIZE_DPI
+    quality_value = 85 if quality == 'high' else 70
+
+    with fitz.open(input_path) as pdf_doc:
+        if pages:
+            pdf_doc.select(parse_page_ranges(pages, len(pdf_doc)))
+
+        seen = set()
+        images_rewritten = 0
+        for page in pdf_doc:
+            images_rewritten += _downsample_page_images(pdf_doc, page, target_dpi, quality_value, seen)
+
+        try:
+            pdf_doc.subset_fonts()
+        except Exception as e:
+            print(f"[PDF optimize] Font subsetting skipped: {e}")
+
+        pdf_doc.save(output_path, garbage=4, deflate=True, clean=True, use_objstms=1)
+
+    optimized_size = os.path.getsize(output_path)
+    if optimized_size >= original_size and not pages:
+        # Nothing to gain; hand back the original bytes
+        shutil.copyfile(input_path, output_path)
+        optimized_size = original_size
+
+    elapsed = time.perf_counter() - start
+    saved = 100 * (1 - optimized_size / original_size) if original_size else 0
+    return {
+        "success": True,
+        "output_path": output_path,
+        "filename": output_filename,
+        "original_size": original_size,
+        "optimized_size": optimized_size,
+        "elapsed": round(elapsed, 2),
+        "note": f"{original_size / 1e6:.2f} MB → {optimized_size / 1e6:.2f} MB (%{saved:.0f} küçüldü), "
+                f"{images_rewritten} resim yeniden sıkıştırıldı, {elapsed:.1f} sn"
+    }
+
+
+def _downsample_page_images(pdf_doc, page, target_dpi: int, quality_value: int, seen: set) -> int:
+    """
+    Re-encode the page's images that are shown above the target DPI as
+    JPEG at that DPI. Each image xref is handled once, on the first page
+    that uses it. Masked and 1-bit images are left alone.
+    """
+    import io
+    import fitz  # PyMuPDF
+    from PIL import Image
+
+    rewritten = 0
+    for xref, smask, width, height, bpc, *_ in page.get_images(full=True):
+        if xref in seen:
+            continue
+        seen.add(xref)
+        if smask or bpc == 1:
+            continue
+
+        rects = page.get_image_rects(xref)
+        if not rects:
+            continue
+        shown = max(rects, key=lambda rect: rect.width * rect.height)
+        if shown.is_empty:
+            continue
+        image_dpi = max(width / (shown.width / 72), height / (shown.height / 72))
+        if image_dpi <= target_dpi * OPTIMIZE_DPI_SLACK:
+            continue
+
+        pix = fitz.Pixmap(pdf_doc, xref)
+        if pix.colorspace is None or pix.colorspace.n not in (1, 3):
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+        if pix.alpha:
+            pix = fitz.Pixmap(pix, 0)
+
+        scale = target_dpi / image_dpi
+        size = (max(1, round(pix.width * scale)), max(1, round(pix.height * scale)))
+        img = _pixmap_to_image(pix).resize(size, Image.LANCZOS)
+        buffer = io.BytesIO()
+        img.save(buffer, 'JPEG', quality=quality_value, optimize=True)
+        del img, pix
+
+        page.replace_image(xref, stream=buffer.getvalue())
+        rewritten += 1
+    return rewritten
+
+
+# A text block counts as a heading when its font is this much larger than
+# the page's body text (by character count); level 1 above the second ratio
+HEADING_RATIO = 1.15
+HEADING_1_RATIO = 1.6
+HEADING_MAX_CHARS = 200
+
+
+def _iter_pdf_pages(input_path: str, pages: str = None):
+    """
+    Shared PDF text engine: yields (page_number, blocks) for the selected
+    pages (see parse_page_ranges) in page order.
+    Blocks are {"type": "heading"|"paragraph", "level": n, "lines": [...]}
+    in reading order. Uses PyMuPDF; falls back to PyPDF2 (no headings).
+    """
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        yield from _iter_pdf_pages_pypdf2(input_path, pages)
+        return
+
+    with fitz.open(input_path) as pdf_doc:
+        for page_index in parse_page_ranges(pages, len(pdf_doc)):
+            page = pdf_doc[page_index]
+            yield page_index + 1, _page_blocks(page.get_text("dict", sort=True)["blocks"])
+
+
+def _page_blocks(raw_blocks: list) -> list:
+    """Turn PyMuPDF 'dict' blocks of one page into heading/paragraph blocks."""
+    size_chars = {}
+    blocks = []
+    for block in raw_blocks:
+        if block["type"] != 0:  # image block
+            continue
+        lines = []
+        block_size = 0
+        for line in block["lines"]:
+            text = "".join(span["text"] for span in line["spans"]).strip()
+            if text:
+                lines.append(text)
+            for span in line["spans"]:
+                chars = len(span["text"].strip())
+                if chars:
+                    size = round(span["size"], 1)
+                    size_chars[size] = size_chars.get(size, 0) + chars
+                    block_size = max(block_size, size)
+        if lines:
+            blocks.append((block_size, lines))
+
+    if not blocks:
+        return []
+
+    body_size = max(size_chars, key=size_chars.get)
+    result = []
+    for size, lines in blocks:
+        if size >= body_size * HEADING_RATIO and len(lines) <= 3 and sum(map(len, lines)) <= HEADING_MAX_CHARS:
+            level = 1 if size >= body_size * HEADING_1_RATIO else 2
+            result.append({"type": "heading", "level": level, "lines": lines})
+        else:
+            result.append({"type": "paragraph", "level": 0, "lines": lines})
+    return result
+
+
+def _iter_pdf_pages_pypdf2(input_path: str, pages: str = None):
+    """Fallback engine: one paragraph per non-empty line, no structure."""
+    import PyPDF2
 
-    text_content = ""
-    
     with open(input_path, 'rb') as pdf_file:
         pdf_reader = PyPDF2.PdfReader(pdf_file)
-        for i, page in enumerate(pdf_reader.pages):
-            page_text = page.extract_text()
-            if page_text:
-                text_content += f"--- Page {i+1} ---\n{page_text}\n\n"
-
-    if not text_content.strip():
+        for page_index in parse_page_ranges(pages, len(pdf_reader.pages)):
+            page_text = pdf_reader.pages[page_index].extract_text() or ""
+            yield page_index + 1, [
+                {"type": "paragraph", "level": 0, "lines": [line.strip()]}
+                for line in page_text.split('\n') if line.strip()
+            ]
+
+
+def _write_pdf_text(output_path: str, output_filename: str, header: str, pages, footer: str = "") -> dict:
+    """
+    Write serialized pages as they are produced so only one page is held in
+    memory; fails (and removes the partial file) if no page had any text.
+    """
+    has_text = False
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(header)
+        for page in pages:
+            if page:
+                f.write(page)
+                has_text = True
+        f.write(footer)
+
+    if not has_text:
+        os.remove(output_path)
         return {"success": False, "error": "Could not extract text from PDF (may be image-based)"}
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(text_content)
-    
     return {"success": True, "output_path": output_path, "filename": output_filename}
 
 
-def _pdf_to_html(input_path: str, output_path: str, output_filename: str, name: str) -> dict:
-    """Convert PDF to HTML."""
+def _pdf_to_text(input_path: str, output_path: str, output_filename: str, target_format: str, name: str,
+                 pages: str = None) -> dict:
+    """Convert PDF to TXT, HTML, MD or RTF, one page at a time."""
+    header, chunks, footer = _pdf_text_parts(input_path, target_format, name, pages)
+    return _write_pdf_text(output_path, output_filename, header, chunks, footer)
+
+
+def stream_pdf_text(input_path: str, target_format: str, pages: str = None):
+    """
+    Return a generator of a PDF's TXT/HTML/MD/RTF conversion chunk by chunk
+    (header, one chunk per page, footer) for progressive download. The PDF
+    is opened and `pages` checked here, so an unreadable file or an empty
+    selection raises before the response starts.
+    """
+    parse_page_ranges(pages, _pdf_page_count(input_path))
+    name = os.path.splitext(os.path.basename(input_path))[0]
+    header, chunks, footer = _pdf_text_parts(input_path, target_format, name, pages)
+    return _stream_parts(header, chunks, footer)
+
+
+def _stream_parts(header: str, chunks, footer: str):
+    yield header
+    for chunk in chunks:
+        if chunk:
+            yield chunk
+    yield footer
+
+
+def _pdf_page_count(input_path: str) -> int:
     try:
-        import PyPDF2
+        import fitz  # PyMuPDF
     except ImportError:
-        return {"success": False, "error": "PyPDF2 not installed. Run 'pip install PyPDF2'"}
+        import PyPDF2
+        with open(input_path, 'rb') as pdf_file:
+            return len(PyPDF2.PdfReader(pdf_file).pages)
 
-    text_content = ""
-    with open(input_path, 'rb') as pdf_file:
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        for page in pdf_reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_content += page_text + "\n\n"
+    with fitz.open(input_path) as pdf_doc:
+        return len(pdf_doc)
+
+
+def _pdf_text_parts(input_path: str, target_format: str, name: str, pages: str = None):
+    """Return (header, lazy page chunks, footer) for a text target."""
+    from html import escape
+
+    if target_format == 'txt':
+        header, serialize, footer = "", _txt_page, ""
+    elif target_format == 'html':
+        header, serialize, footer = _HTML_HEADER.format(title=escape(name)), _html_page, "</body>\n</html>"
+    elif target_format == 'md':
+        header, serialize, footer = f"# {name}\n\n", _md_page, ""
+    elif target_format == 'rtf':
+        header, serialize, footer = "{\\rtf1\\ansi\\deff0\n", _rtf_page, "}"
+    else:
+        raise ValueError(f"Unsupported text format for PDF: {target_format}")
+
+    chunks = (serialize(page_num, blocks) for page_num, blocks in _iter_pdf_pages(input_path, pages))
+    return header, chunks, footer
 
-    if not text_content.strip():
-        return {"success": False, "error": "Could not extract text from PDF (may be image-based)"}
 
-    html_content = f"""<!DOCTYPE html>
+def _txt_page(page_num: int, blocks: list) -> str:
+    if not blocks:
+        return ""
+    text = "\n".join("\n".join(block["lines"]) for block in blocks)
+    return f"--- Page {page_num} ---\n{text}\n\n"
+
+
+_HTML_HEADER = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{name}</title>
+    <title>{title}</title>
     <style>
         body {{ 
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; 
@@ -153,80 +491,65 @@ def _pdf_to_html(input_path: str, output_path: str, output_filename: str, name:
     </style>
 </head>
 <body>
-    <h1>{name}</h1>
+    <h1>{title}</h1>
 """
-    for para in text_content.split('\n'):
-        if para.strip():
-            html_content += f"    <p>{para}</p>\n"
-    html_content += "</body>\n</html>"
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    return {"success": True, "output_path": output_path, "filename": output_filename}
-
-
-def _pdf_to_md(input_path: str, output_path: str, output_filename: str, name: str) -> dict:
-    """Convert PDF to Markdown."""
-    try:
-        import PyPDF2
-    except ImportError:
-        return {"success": False, "error": "PyPDF2 not installed. Run 'pip install PyPDF2'"}
-
-    text_content = ""
-    with open(input_path, 'rb') as pdf_file:
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        for page in pdf_reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_content += page_text + "\n\n"
 
-    if not text_content.strip():
-        return {"success": False, "error": "Could not extract text from PDF (may be image-based)"}
 
-    md_content = f"# {name}\n\n"
-    for para in text_content.split('\n'):
-        if para.strip():
-            md_content += f"{para}\n\n"
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(md_content)
-    
-    return {"success": True, "output_path": output_path, "filename": output_filename}
+def _html_page(page_num: int, blocks: list) -> str:
+    from html import escape
 
+    parts = []
+    for block in blocks:
+        text = escape(" ".join(block["lines"]))
+        if block["type"] == "heading":
+            tag = f"h{block['level'] + 1}"
+            parts.append(f"    <{tag}>{text}</{tag}>\n")
+        else:
+            parts.append(f"    <p>{text}</p>\n")
+    return "".join(parts)
 
-def _pdf_to_rtf(input_path: str, output_path: str, output_filename: str) -> dict:
-    """Convert PDF to RTF."""
-    try:
-        import PyPDF2
-    except ImportError:
-        return {"success": False, "error": "PyPDF2 not installed. Run 'pip install PyPDF2'"}
-
-    text_content = ""
-    with open(input_path, 'rb') as pdf_file:
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        for page in pdf_reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_content += page_text + "\n\n"
-
-    if not text_content.strip():
-        return {"success": False, "error": "Could not extract text from PDF (may be image-based)"}
 
-    rtf_content = "{\\rtf1\\ansi\\deff0\n"
-    for para in text_content.split('\n'):
-        if para.strip():
-            escaped = para.encode('unicode_escape').decode('ascii')
-            rtf_content += f"\\par {escaped}\n"
-    rtf_content += "}"
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(rtf_content)
-    
-    return {"success": True, "output_path": output_path, "filename": output_filename}
+def _md_page(page_num: int, blocks: list) -> str:
+    parts = []
+    for block in blocks:
+        text = " ".join(block["lines"])
+        if block["type"] == "heading":
+            parts.append(f"{'#' * (block['level'] + 1)} {text}\n\n")
+        else:
+            parts.append(f"{text}\n\n")
+    return "".join(parts)
+
+
+def _rtf_escape(text: str) -> str:
+    """Escape RTF control characters and encode non-ASCII as \\uN? sequences."""
+    out = []
+    for char in text:
+        if char in '\\{}':
+            out.append('\\' + char)
+        elif ord(char) < 128:
+            out.append(char)
+        else:
+            # \\u takes signed 16-bit units; characters outside the BMP become surrogate pairs
+            encoded = char.encode('utf-16-le')
+            for i in range(0, len(encoded), 2):
+                out.append(f"\\u{int.from_bytes(encoded[i:i + 2], 'little', signed=True)}?")
+    return "".join(out)
+
+
+def _rtf_page(page_num: int, blocks: list) -> str:
+    parts = []
+    for block in blocks:
+        text = _rtf_escape(" ".join(block["lines"]))
+        if block["type"] == "heading":
+            font_size = 36 if block["level"] == 1 else 28
+            parts.append(f"\\pard{{\\b\\fs{font_size} {text}}}\\par\n")
+        else:
+            parts.append(f"\\pard {text}\\par\n")
+    return "".join(parts)
 
 
-def _pdf_to_images(input_path: str, output_dir: str, target_format: str, name: str) -> dict:
+def _pdf_to_images(input_path: str, output_dir: str, target_format: str, stem: str,
+                   pages: str = None, dpi: int = None, quality: str = "high", unit: str = "sayfa") -> dict:
     """Convert PDF pages to images using PyMuPDF (no Poppler needed)."""
     try:
         import fitz  # PyMuPDF
@@ -234,26 +557,8 @@ def _pdf_to_images(input_path: str, output_dir: str, target_format: str, name: s
         return {"success": False, "error": "PyMuPDF yüklü değil. 'pip install PyMuPDF' çalıştırın."}
     
     try:
-        pdf_doc = fitz.open(input_path)
-        output_files = []
-        
-        for page_num in range(len(pdf_doc)):
-            page = pdf_doc[page_num]
-            # Higher resolution for better quality (2x = 144 DPI)
-            mat = fitz.Matrix(2.0, 2.0)
-            pix = page.get_pixmap(matrix=mat)
-            
-            img_filename = f"{name}_page_{page_num + 1}.{target_format}"
-            img_path = os.path.join(output_dir, img_filename)
-            
-            if target_format.lower() in ['jpg', 'jpeg']:
-                pix.save(img_path, output="jpeg", jpg_quality=95)
-            else:
-                pix.save(img_path)
-            
-            output_files.append(img_filename)
-        
-        pdf_doc.close()
+        output_files = render_pdf_pages(input_path, output_dir, target_format, stem,
+                                        pages=pages, dpi=dpi, quality=quality)
         
         if output_files:
             return {
@@ -261,10 +566,304 @@ def _pdf_to_images(input_path: str, output_dir: str, target_format: str, name: s
                 "output_path": os.path.join(output_dir, output_files[0]), 
                 "filename": output_files[0],
                 "all_files": output_files,
-                "note": f"{len(output_files)} sayfa resmi oluşturuldu"
+                "note": f"{len(output_files)} {unit} resmi oluşturuldu"
             }
         
         return {"success": False, "error": "Sayfa dönüştürülemedi"}
         
+    except ValueError:
+        raise
     except Exception as e:
         return {"success": False, "error": f"PDF→resim dönüşüm hatası: {str(e)}"}
+
+
+# Higher resolution for better quality (2x zoom = 144 DPI)
+RENDER_DPI = 144
+PAGE_MAX_DPI = 600
+# Documents with fewer pages are rendered in-process; process start-up
+# costs more than it saves on short documents
+PARALLEL_RENDER_MIN_PAGES = int(os.environ.get('UC_PARALLEL_RENDER_MIN_PAGES', 16))
+RENDER_WORKERS = int(os.environ.get('UC_RENDER_WORKERS', 0)) or os.cpu_count() or 1
+
+
+# Display time per page in PDF→animated WebP
+PAGE_FRAME_DURATION = 1000
+
+
+def render_pdf_pages(pdf_path: str, output_dir: str, target_format: str, stem: str, workers: int | None = None,
+                     pages: str = None, dpi: int = None, quality: str = "high") -> list:
+    """
+    Rasterize the selected pages (all by default) to {stem}_{n}.{target_format}
+    and return the file names in page order. Long selections are split into
+    contiguous runs rendered by worker processes, each with its own fitz document.
+    """
+    import fitz  # PyMuPDF
+
+    dpi = dpi or RENDER_DPI
+    if not 1 <= dpi <= PAGE_MAX_DPI:
+        raise ValueError(f"DPI must be between 1 and {PAGE_MAX_DPI}")
+
+    with fitz.open(pdf_path) as pdf_doc:
+        page_indices = parse_page_ranges(pages, len(pdf_doc))
+
+    workers = min(workers or RENDER_WORKERS, len(page_indices))
+    if workers <= 1 or len(page_indices) < PARALLEL_RENDER_MIN_PAGES:
+        return _render_page_range(pdf_path, page_indices, output_dir, target_format, stem, dpi, quality)
+
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    bounds = [len(page_indices) * i // workers for i in range(workers + 1)]
+    # spawn: forking a threaded server process is unsafe and fitz state must not be shared
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = [
+            pool.submit(_render_page_range, pdf_path, page_indices[start:end], output_dir, target_format, stem,
+                        dpi, quality)
+            for start, end in zip(bounds, bounds[1:])
+        ]
+        return [filename for future in futures for filename in future.result()]
+
+
+def _render_page_range(pdf_path: str, page_indices: list, output_dir: str, target_format: str, stem: str,
+                       dpi: int = RENDER_DPI, quality: str = "high") -> list:
+    """Render the given 0-based pages of a PDF; runs in worker processes too."""
+    import fitz  # PyMuPDF
+    from .images import _save_image
+
+    output_files = []
+    with fitz.open(pdf_path) as pdf_doc:
+        for page_num in page_indices:
+            pix = pdf_doc[page_num].get_pixmap(dpi=dpi)
+
+            img_filename = f"{stem}_{page_num + 1}.{target_format}"
+            img_path = os.path.join(output_dir, img_filename)
+
+            if target_format.lower() in ['jpg', 'jpeg']:
+                pix.save(img_path, output="jpeg", jpg_quality=95 if quality == 'high' else 80)
+            elif target_format.lower() == 'png':
+                pix.save(img_path)
+            else:
+                result = _save_image(_pixmap_to_image(pix), img_path, img_filename, target_format, quality)
+                if not result["success"]:
+                    raise RuntimeError(result["error"])
+
+            output_files.append(img_filename)
+    return output_files
+
+
+def _pixmap_to_image(pix):
+    """
+    Wrap a pixmap's samples as a Pillow image without copying. The image
+    shares the pixmap's memory, so pix must outlive it.
+    """
+    from PIL import Image
+
+    mode = {1: 'L', 3: 'RGB', 4: 'RGBA'}[pix.n]
+    return Image.frombuffer(mode, (pix.width, pix.height), pix.samples_mv, 'raw', mode, pix.stride, 1)
+
+
+def pdf_to_multipage_image(pdf_path: str, output_path: str, output_filename: str, target_format: str,
+                           pages: str = None, dpi: int = None, quality: str = "high") -> dict:
+    """
+    Render the selected pages into one multi-page TIFF or animated WebP.
+    Pages are rendered and appended one at a time.
+    """
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        return {"success": False, "error": "PyMuPDF yüklü değil. 'pip install PyMuPDF' çalıştırın."}
+
+    if target_format not in PDF_MULTIPAGE_FORMATS:
+        return {"success": False, "error": f"Multi-page output is only available for TIFF and WEBP, not {target_format}"}
+
+    dpi = dpi or RENDER_DPI
+    if not 1 <= dpi <= PAGE_MAX_DPI:
+        raise ValueError(f"DPI must be between 1 and {PAGE_MAX_DPI}")
+
+    with fitz.open(pdf_path) as pdf_doc:
+        page_indices = parse_page_ranges(pages, len(pdf_doc))
+        if target_format == 'webp':
+            from .images import _write_animated_webp
+            frames = _iter_page_frames(pdf_doc, page_indices, dpi)
+            _write_animated_webp(frames, output_path, 0, 95 if quality == 'high' else 80, 6 if quality == 'high' else 4)
+        else:
+            from PIL import TiffImagePlugin
+            compression = 'tiff_lzw' if quality == 'high' else 'tiff_deflate'
+            with TiffImagePlugin.AppendingTiffWriter(output_path, new=True) as tiff:
+                for page_num in page_indices:
+                    pix = pdf_doc[page_num].get_pixmap(dpi=dpi)
+                    _pixmap_to_image(pix).save(tiff, 'TIFF', compression=compression, dpi=(dpi, dpi))
+                    tiff.newFrame()
+
+    return {
+        "success": True,
+        "output_path": output_path,
+        "filename": output_filename,
+        "note": f"{len(page_indices)} sayfa tek dosyada birleştirildi"
+    }
+
+
+def _iter_page_frames(pdf_doc, page_indices: list, dpi: int):
+    """
+    Yield (frame, duration, disposal) per page for the animated WebP writer.
+    The canvas is the first page's size; other pages are scaled to fit and
+    centred on white.
+    """
+    from PIL import Image
+
+    canvas_size = None
+    for page_num in page_indices:
+        pix = pdf_doc[page_num].get_pixmap(dpi=dpi)
+        frame = _pixmap_to_image(pix)
+        if canvas_size is None:
+            canvas_size = frame.size
+        if frame.size != canvas_size:
+            scale = min(canvas_size[0] / frame.width, canvas_size[1] / frame.height)
+            fitted = frame.resize((max(1, round(frame.width * scale)), max(1, round(frame.height * scale))),
+                                  Image.LANCZOS)
+            frame = Image.new('RGB', canvas_size, (255, 255, 255))
+            frame.paste(fitted, ((canvas_size[0] - fitted.width) // 2, (canvas_size[1] - fitted.height) // 2))
+        yield frame, PAGE_FRAME_DURATION, 1
+
+
+PAGE_MEDIA_TYPES = {'png': 'image/png', 'jpg': 'image/jpeg', 'jpeg': 'image/jpeg', 'webp': 'image/webp'}
+# Rendered single pages, LRU by total encoded size
+PAGE_CACHE_BYTES = int(os.environ.get('UC_PAGE_CACHE_MB', 256)) * 1024 * 1024
+# Open fitz documents kept warm for page requests
+DOC_POOL_SIZE = 4
+HASH_CACHE_SIZE = 64
+
+_page_cache = OrderedDict()
+_page_cache_bytes = 0
+_page_cache_lock = threading.Lock()
+_doc_pool = OrderedDict()
+_doc_pool_lock = threading.Lock()
+_hash_cache = OrderedDict()
+
+
+async def render_pdf_page(input_path: str, page: int, dpi: int = 144, image_format: str = 'png') -> tuple:
+    """Render one page (1-based) on demand; returns (image bytes, page count)."""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, _render_pdf_page, input_path, page, dpi, image_format)
+
+
+def _render_pdf_page(input_path: str, page: int, dpi: int, image_format: str) -> tuple:
+    if image_format not in PAGE_MEDIA_TYPES:
+        raise ValueError(f"Unsupported page format: {image_format}")
+    if not 1 <= dpi <= PAGE_MAX_DPI:
+        raise ValueError(f"DPI must be between 1 and {PAGE_MAX_DPI}")
+
+    content_hash = _content_hash(input_path)
+    with _pooled_document(input_path, content_hash) as pooled:
+        page_count = pooled.page_count
+        if not 1 <= page <= page_count:
+            raise ValueError(f"Page {page} out of range (1-{page_count})")
+
+        key = (content_hash, page, dpi, 'jpg' if image_format == 'jpeg' else image_format)
+        with _page_cache_lock:
+            if key in _page_cache:
+                _page_cache.move_to_end(key)
+                return _page_cache[key], page_count
+
+        # fitz documents are not safe for concurrent use
+        with pooled.lock:
+            pix = pooled.doc[page - 1].get_pixmap(dpi=dpi)
+            if image_format == 'png':
+                data = pix.tobytes('png')
+            elif image_format == 'webp':
+                import io
+                buffer = io.BytesIO()
+                _pixmap_to_image(pix).save(buffer, 'WEBP', quality=90, method=4)
+                data = buffer.getvalue()
+            else:
+                data = pix.tobytes('jpg', jpg_quality=95)
+
+    _cache_page(key, data)
+    return data, page_count
+
+
+def _cache_page(key: tuple, data: bytes):
+    global _page_cache_bytes
+    if len(data) > PAGE_CACHE_BYTES:
+        return
+    with _page_cache_lock:
+        if key in _page_cache:
+            return
+        _page_cache[key] = data
+        _page_cache_bytes += len(data)
+        while _page_cache_bytes > PAGE_CACHE_BYTES:
+            _, evicted = _page_cache.popitem(last=False)
+            _page_cache_bytes -= len(evicted)
+
+
+def _content_hash(input_path: str) -> str:
+    """SHA-256 of the file, memoized by path, mtime and size."""
+    stat = os.stat(input_path)
+    key = (os.path.abspath(input_path), stat.st_mtime_ns, stat.st_size)
+    with _doc_pool_lock:
+        if key in _hash_cache:
+            _hash_cache.move_to_end(key)
+            return _hash_cache[key]
+
+    digest = hashlib.sha256()
+    with open(input_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+    with _doc_pool_lock:
+        _hash_cache[key] = digest.hexdigest()
+        while len(_hash_cache) > HASH_CACHE_SIZE:
+            _hash_cache.popitem(last=False)
+    return digest.hexdigest()
+
+
+class _PooledDocument:
+    """Open fitz document shared by page requests; closed once evicted and no request holds it."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.page_count = len(doc)
+        self.lock = threading.Lock()
+        self.users = 0
+        self.evicted = False
+
+
+@contextmanager
+def _pooled_document(input_path: str, content_hash: str):
+    """Borrow the open document for a content hash from an LRU of DOC_POOL_SIZE."""
+    import fitz  # PyMuPDF
+
+    with _doc_pool_lock:
+        entry = _doc_pool.get(content_hash)
+        if entry is not None:
+            _doc_pool.move_to_end(content_hash)
+            entry.users += 1
+
+    if entry is None:
+        opened = _PooledDocument(fitz.open(input_path))
+        closing = []
+        with _doc_pool_lock:
+            entry = _doc_pool.get(content_hash)
+            if entry is not None:
+                # Another request opened it meanwhile
+                closing.append(opened)
+            else:
+                entry = _doc_pool[content_hash] = opened
+                while len(_doc_pool) > DOC_POOL_SIZE:
+                    stale = _doc_pool.popitem(last=False)[1]
+                    stale.evicted = True
+                    if stale.users == 0:
+                        closing.append(stale)
+            entry.users += 1
+        for stale in closing:
+            stale.doc.close()
+
+    try:
+        yield entry
+    finally:
+        with _doc_pool_lock:
+            entry.users -= 1
+            release = entry.evicted and entry.users == 0
+        if release:
+            # Evicted while borrowed: the last borrower closes it
+            entry.doc.close()
@@ -0,0 +1,337 @@
+"""
+Conversion Planner
+Finds the cheapest chain of converters between two formats (e.g. DOCX -> PDF -> PNG)
+and shares intermediate results between requests for the same source file.
+"""
+import os
+import time
+import heapq
+import shutil
+import asyncio
+import tempfile
+import threading
+from collections import OrderedDict
+
+from .images import _process_image
+from .video import convert_media, VIDEO_FORMATS, AUDIO_FORMATS
+from .docs import _process_data
+from .pdf import _process_pdf, _content_hash, PDF_IMAGE_FORMATS, PDF_TEXT_FORMATS
+from .docx_converter import _process_docx
+from .pptx_converter import _process_pptx
+from .archive import _process_archive
+
+# Seconds per conversion until real timings replace them
+OFFICE_COST = 8.0
+RENDER_COST = 1.5
+TEXT_COST = 0.5
+IMAGE_COST = 0.3
+DATA_COST = 0.5
+MEDIA_COST = 10.0
+ARCHIVE_COST = 2.0
+
+# Weight of the newest timing in the per-edge moving average
+COST_SMOOTHING = 0.3
+
+# Finished intermediates kept per (source hash, format)
+PLAN_CACHE_SIZE = int(os.environ.get("UC_PLAN_CACHE_SIZE", "32"))
+PLAN_CACHE_DIR = os.path.join(tempfile.gettempdir(), "uc_plan_cache")
+
+IMAGE_SOURCES = ['jpg', 'jpeg', 'png', 'webp', 'bmp', 'tiff', 'tif', 'ico', 'gif', 'heic', 'heif', 'svg', 'avif']
+IMAGE_TARGETS = ['webp', 'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff', 'tif', 'ico', 'avif', 'heic', 'heif', 'pdf']
+DATA_FORMATS = ['csv', 'xlsx', 'json', 'jsonl', 'xml', 'html', 'txt', 'parquet', 'feather']
+ARCHIVE_SOURCES = ['zip', '7z', 'tar', 'gz', 'tgz', 'bz2', 'tar.gz', 'tar.bz2', 'tar.xz']
+ARCHIVE_TARGETS = ['zip', '7z', 'tar', 'tar.gz', 'tgz', 'gz']
+
+# Page images rendered from an intermediate PDF are named after the original document's pages
+PAGE_LABELS = {'pptx': ('slide', 'slayt'), 'ppt': ('slide', 'slayt')}
+
+
+class _Edge:
+    """
+    One converter step. Only ``chain`` edges (e.g. office -> PDF) produce an intermediate that later
+    steps may convert further; every other edge can only be the last hop, so document text never
+    turns into a data table. ``fallback`` edges are only tried after a planned path fails.
+    """
+
+    def __init__(self, source: str, target: str, runner, cost: float, chain: bool = False, fallback: bool = False):
+        self.source = source
+        self.target = target
+        self.runner = runner
+        self.cost = cost
+        self.chain = chain
+        self.fallback = fallback
+
+
+_edges = {}
+_edges_lock = threading.Lock()
+_artifacts = OrderedDict()
+_artifacts_lock = threading.Lock()
+
+
+def register_edge(sources: list, targets: list, runner, cost: float, chain: bool = False, fallback: bool = False):
+    """Register runner(input_path, output_dir, target_format, options) for every source -> target pair."""
+    for source in sources:
+        for target in targets:
+            _edges.setdefault(source, {})[target] = _Edge(source, target, runner, cost, chain, fallback)
+
+
+def _run_image(input_path, output_dir, target_format, options):
+    return _process_image(input_path, output_dir, target_format, options.get('quality', 'high'),
+                          options.get('max_size'), options.get('dpi'))
+
+
+def _run_pdf(input_path, output_dir, target_format, options):
+    return _process_pdf(input_path, output_dir, target_format, options.get('pages'), options.get('dpi'),
+                        options.get('quality', 'high'), options.get('multipage', False), options.get('stem'),
+                        options.get('unit', 'sayfa'))
+
+
+def _run_pptx(input_path, output_dir, target_format, options):
+    return _process_pptx(input_path, output_dir, target_format, options.get('quality', 'high'),
+                         options.get('multipage', False))
+
+
+def _run_media(input_path, output_dir, target_format, options):
+    # FFmpeg runs as an asyncio subprocess; planner steps execute on a worker thread
+    return asyncio.run(convert_media(input_path, output_dir, target_format, options.get('quality', 'high')))
+
+
+def _run_data(input_path, output_dir, target_format, options):
+    return _process_data(input_path, output_dir, target_format, options.get('sheet'), options.get('record_path'))
+
+
+def _run_plain(process):
+    return lambda input_path, output_dir, target_format, options: process(input_path, output_dir, target_format)
+
+
+register_edge(IMAGE_SOURCES, IMAGE_TARGETS, _run_image, IMAGE_COST)
+register_edge(['pdf'], ['docx'], _run_pdf, RENDER_COST * 2)
+register_edge(['pdf'], list(PDF_TEXT_FORMATS), _run_pdf, TEXT_COST)
+register_edge(['pdf'], PDF_IMAGE_FORMATS, _run_pdf, RENDER_COST)
+register_edge(['pdf'], ['pdf'], _run_pdf, RENDER_COST)
+register_edge(['docx', 'doc'], ['pdf'], _run_plain(_process_docx), OFFICE_COST, chain=True)
+register_edge(['docx', 'doc'], ['txt', 'html', 'md'], _run_plain(_process_docx), TEXT_COST)
+register_edge(['pptx', 'ppt'], ['pdf'], _run_pptx, OFFICE_COST, chain=True)
+register_edge(['pptx', 'ppt'], ['txt'], _run_pptx, TEXT_COST)
+# Slide images normally go through the shared PDF; the direct path extracts embedded media without an office suite
+register_edge(['pptx', 'ppt'], PDF_IMAGE_FORMATS, _run_pptx, OFFICE_COST + RENDER_COST, fallback=True)
+register_edge(VIDEO_FORMATS, VIDEO_FORMATS + AUDIO_FORMATS + ['gif'], _run_media, MEDIA_COST)
+register_edge(AUDIO_FORMATS, AUDIO_FORMATS, _run_media, MEDIA_COST)
+register_edge(DATA_FORMATS + ['xls'], DATA_FORMATS, _run_data, DATA_COST)
+register_edge(ARCHIVE_SOURCES, ARCHIVE_TARGETS, _run_plain(_process_archive), ARCHIVE_COST)
+
+
+def source_format(path: str) -> str:
+    """Lower-case format key of a file, keeping compound archive suffixes like tar.gz."""
+    name = os.path.basename(path).lower()
+    for compound in ['tar.gz', 'tar.bz2', 'tar.xz']:
+        if name.endswith('.' + compound):
+            return compound
+    return os.path.splitext(name)[1].lstrip('.')
+
+
+def has_edge(source: str, target: str) -> bool:
+    """True if a single registered converter handles source -> target."""
+    edge = _edges.get(source, {}).get(target)
+    return edge is not None and not edge.fallback
+
+
+def plan(source: str, target: str, cached: set = frozenset(), excluded: set = frozenset(),
+         allow_fallback: bool = False) -> list:
+    """
+    Cheapest edge list from source to target (Dijkstra over measured costs).
+    Formats in ``cached`` are already available for this file and cost nothing to reach.
+    Returns None when no path exists.
+    """
+    if source == target:
+        edge = _edges.get(source, {}).get(target)
+        return [edge] if edge and (allow_fallback or not edge.fallback) else None
+
+    best = {source: 0.0}
+    previous = {}
+    queue = [(0.0, source)]
+    for fmt in cached & _chain_formats(source):
+        if fmt != source:
+            best[fmt] = 0.0
+            queue.append((0.0, fmt))
+    heapq.heapify(queue)
+
+    while queue:
+        cost, fmt = heapq.heappop(queue)
+        if fmt == target:
+            break
+        if cost > best.get(fmt, float('inf')):
+            continue
+        for edge in _edges.get(fmt, {}).values():
+            if (edge.source, edge.target) in excluded or (edge.fallback and not allow_fallback):
+                continue
+            if not edge.chain and edge.target != target:
+                continue
+            total = cost + edge.cost
+            if total < best.get(edge.target, float('inf')):
+                best[edge.target] = total
+                previous[edge.target] = edge
+                heapq.heappush(queue, (total, edge.target))
+
+    if target not in best:
+        return None
+    path = []
+    fmt = target
+    while fmt in previous and best[fmt] > 0:
+        path.append(previous[fmt])
+        fmt = previous[fmt].source
+    return list(reversed(path))
+
+
+def _chain_formats(source: str) -> set:
+    """Intermediates a chain may pass through from source; cached artifacts of other formats are ignored."""
+    reached = set()
+    pending = [source]
+    while pending:
+        for edge in _edges.get(pending.pop(), {}).values():
+            if edge.chain and edge.target not in reached:
+                reached.add(edge.target)
+                pending.append(edge.target)
+    return reached
+
+
+def clear_plan_cache():
+    """Drop cached intermediates, including files left in PLAN_CACHE_DIR by a previous run."""
+    with _artifacts_lock:
+        _artifacts.clear()
+    shutil.rmtree(PLAN_CACHE_DIR, ignore_errors=True)
+
+
+def _record_cost(edge: _Edge, elapsed: float):
+    with _edges_lock:
+        edge.cost = (1 - COST_SMOOTHING) * edge.cost + COST_SMOOTHING * elapsed
+
+
+def _cached_formats(content_hash: str) -> set:
+    with _artifacts_lock:
+        return {fmt for hash_, fmt in _artifacts if hash_ == content_hash}
+
+
+def _take_artifact(content_hash: str, fmt: str, dest: str, link: bool = False) -> bool:
+    """Copy a cached intermediate to dest (hard link for private work files); False if it is gone."""
+    with _artifacts_lock:
+        path = _artifacts.get((content_hash, fmt))
+        if path is None:
+            return False
+        _artifacts.move_to_end((content_hash, fmt))
+    try:
+        _copy_artifact(path, dest, link)
+        return True
+    except OSError:
+        with _artifacts_lock:
+            _artifacts.pop((content_hash, fmt), None)
+        return False
+
+
+def _store_artifact(content_hash: str, fmt: str, path: str):
+    os.makedirs(PLAN_CACHE_DIR, exist_ok=True)
+    cached_path = os.path.join(PLAN_CACHE_DIR, f"{content_hash}.{fmt}")
+    try:
+        # Output files can be overwritten in place later, so the cache keeps its own copy
+        _copy_artifact(path, cached_path)
+    except OSError:
+        return
+
+    evicted = []
+    with _artifacts_lock:
+        _artifacts[(content_hash, fmt)] = cached_path
+        _artifacts.move_to_end((content_hash, fmt))
+        while len(_artifacts) > PLAN_CACHE_SIZE:
+            evicted.append(_artifacts.popitem(last=False)[1])
+    for stale in evicted:
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+
+
+def _copy_artifact(src: str, dest: str, link: bool = False):
+    if os.path.exists(dest):
+        os.remove(dest)
+    if link:
+        try:
+            os.link(src, dest)
+            return
+        except OSError:
+            pass
+    shutil.copyfile(src, dest)
+
+
+async def convert_planned(input_path: str, output_dir: str, target_format: str, **options) -> dict:
+    """Convert along the cheapest converter chain, reusing cached intermediates."""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, lambda: _convert_planned(input_path, output_dir, target_format, options))
+
+
+def _convert_planned(input_path: str, output_dir: str, target_format: str, options: dict) -> dict:
+    source = source_format(input_path)
+    name = os.path.basename(input_path)[:-len(source) - 1] if source else os.path.basename(input_path)
+    content_hash = _content_hash(input_path)
+
+    # Single-file results (e.g. DOCX -> PDF) can be handed out again without converting
+    with tempfile.TemporaryDirectory(prefix="uc_plan_") as work_dir:
+        output_filename = f"{name}.{target_format}"
+        output_path = os.path.join(output_dir, output_filename)
+        if not options and _take_artifact(content_hash, target_format, output_path):
+            return {"success": True, "output_path": output_path, "filename": output_filename,
+                    "note": "Önbellekten alındı"}
+
+        excluded = set()
+        allow_fallback = False
+        first_error = None
+        while True:
+            path = plan(source, target_format, _cached_formats(content_hash) - {target_format}, excluded,
+                        allow_fallback)
+            if not path:
+                if not allow_fallback:
+                    allow_fallback = True
+                    continue
+                return first_error or {"success": False,
+                                       "error": f"No conversion path from {source or 'unknown'} to {target_format}"}
+
+            result, failed = _run_path(path, input_path, work_dir, output_dir, name, content_hash, options)
+            if result["success"]:
+                if len(path) > 1:
+                    steps = " → ".join([path[0].source] + [edge.target for edge in path])
+                    result["note"] = f"{result['note']} ({steps})" if result.get("note") else steps
+                return result
+            first_error = first_error or result
+            if failed:
+                excluded.add((failed.source, failed.target))
+
+
+def _run_path(path: list, input_path: str, work_dir: str, output_dir: str, name: str, content_hash: str,
+              options: dict):
+    """Run each edge in turn; returns (result, failed_edge)."""
+    current = input_path
+    start = path[0].source
+    source = source_format(input_path)
+    last_options = options
+    if source in PAGE_LABELS and path[-1].source != source:
+        suffix, unit = PAGE_LABELS[source]
+        last_options = {**options, 'stem': f"{name}_{suffix}", 'unit': unit}
+    if start != source:
+        # The walk begins at a cached intermediate
+        current = os.path.join(work_dir, f"{name}.{start}")
+        if not _take_artifact(content_hash, start, current, link=True):
+            return {"success": False, "error": f"Cached {start} intermediate expired"}, None
+
+    for index, edge in enumerate(path):
+        last = index == len(path) - 1
+        began = time.perf_counter()
+        result = edge.runner(current, output_dir if last else work_dir, edge.target, last_options if last else {})
+        if not result.get("success"):
+            return result, edge
+        _record_cost(edge, time.perf_counter() - began)
+
+        # Only default-option results are reusable for other requests
+        if not result.get("all_files") and (not last or not options):
+            _store_artifact(content_hash, edge.target, result["output_path"])
+        current = result["output_path"]
+
+    return result, None
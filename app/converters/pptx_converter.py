@@ -4,18 +4,24 @@ Converts PowerPoint files to PDF and images.
 Uses PyMuPDF for PDF to image conversion (no Poppler needed).
 """
 import os
-import asyncio
-import subprocess
 import shutil
+import asyncio
+import zipfile
+import posixpath
+
+from .office import office_to_pdf
+from .pdf import PDF_IMAGE_FORMATS
 
 
-async def convert_pptx(input_path: str, output_dir: str, target_format: str) -> dict:
+async def convert_pptx(input_path: str, output_dir: str, target_format: str, quality: str = "high",
+                       multipage: bool = False) -> dict:
     """PPTX converter supporting PDF and image outputs."""
     loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, _process_pptx, input_path, output_dir, target_format)
+    return await loop.run_in_executor(None, _process_pptx, input_path, output_dir, target_format, quality, multipage)
 
 
-def _process_pptx(input_path: str, output_dir: str, target_format: str) -> dict:
+def _process_pptx(input_path: str, output_dir: str, target_format: str, quality: str = "high",
+                  multipage: bool = False) -> dict:
     try:
         filename = os.path.basename(input_path)
         name, ext = os.path.splitext(filename)
@@ -24,8 +30,8 @@ def _process_pptx(input_path: str, output_dir: str, target_format: str) -> dict:
 
         if target_format == 'pdf':
             return _pptx_to_pdf(input_path, output_path, output_filename)
-        elif target_format in ['png', 'jpg', 'jpeg']:
-            return _pptx_to_images(input_path, output_dir, target_format, name)
+        elif target_format in PDF_IMAGE_FORMATS:
+            return _pptx_to_images(input_path, output_dir, target_format, name, quality, multipage)
         elif target_format == 'txt':
             return _pptx_to_txt(input_path, output_path, output_filename)
         else:
@@ -40,35 +46,9 @@ def _pptx_to_pdf(input_path: str, output_path: str, output_filename: str) -> dic
     
     # Method 1: Try LibreOffice (cross-platform)
     try:
-        libreoffice_paths = [
-            r"C:\Program Files\LibreOffice\program\soffice.exe",
-            r"C:\Program Files (x86)\LibreOffice\program\soffice.exe",
-            "soffice",
-            "/usr/bin/soffice",
-            "/Applications/LibreOffice.app/Contents/MacOS/soffice"
-        ]
-        
-        soffice_path = None
-        for path in libreoffice_paths:
-            if os.path.exists(path) or shutil.which(path):
-                soffice_path = path
-                break
-        
-        if soffice_path:
-            out_dir = os.path.dirname(output_path)
-            result = subprocess.run([
-                soffice_path,
-                "--headless",
-                "--convert-to", "pdf",
-                "--outdir", out_dir,
-                input_path
-            ], capture_output=True, text=True, timeout=180)
-            
-            expected_output = os.path.join(out_dir, os.path.splitext(os.path.basename(input_path))[0] + ".pdf")
-            if os.path.exists(expected_output):
-                if expected_output != output_path:
-                    shutil.move(expected_output, output_path)
-                return {"success": True, "output_path": output_path, "filename": output_filename}
+        office_to_pdf(input_path, output_path)
+        if os.path.exists(output_path):
+            return {"success": True, "output_path": output_path, "filename": output_filename}
     except Exception as e:
         print(f"[PPTX→PDF] LibreOffice failed: {e}")
     
@@ -97,7 +77,8 @@ def _pptx_to_pdf(input_path: str, output_path: str, output_filename: str) -> dic
     }
 
 
-def _pptx_to_images(input_path: str, output_dir: str, target_format: str, name: str) -> dict:
+def _pptx_to_images(input_path: str, output_dir: str, target_format: str, name: str, quality: str = "high",
+                    multipage: bool = False) -> dict:
     """Convert PPTX to images using PyMuPDF (no Poppler needed)."""
     import zipfile
     
@@ -112,12 +93,12 @@ def _pptx_to_images(input_path: str, output_dir: str, target_format: str, name:
             with zipfile.ZipFile(input_path, 'r') as pptx:
                 for i, item in enumerate(pptx.namelist()):
                     if item.startswith('ppt/media/') and any(item.lower().endswith(ext) for ext in ['.png', '.jpg', '.jpeg', '.gif']):
-                        img_data = pptx.read(item)
                         original_ext = os.path.splitext(item)[1]
                         img_filename = f"{name}_image_{i+1}{original_ext}"
                         img_path = os.path.join(output_dir, img_filename)
-                        with open(img_path, 'wb') as f:
-                            f.write(img_data)
+                        # Stream the member; embedded media can be far larger than memory should hold
+                        with pptx.open(item) as src, open(img_path, 'wb') as f:
+                            shutil.copyfileobj(src, f, 1024 * 1024)
                         images_extracted.append(img_filename)
             
             if images_extracted:
@@ -133,28 +114,16 @@ def _pptx_to_images(input_path: str, output_dir: str, target_format: str, name:
     
     # Convert PDF to images using PyMuPDF (fitz) - NO POPPLER NEEDED!
     try:
-        import fitz  # PyMuPDF
-        
-        pdf_doc = fitz.open(pdf_path)
-        output_files = []
+        from .pdf import render_pdf_pages, pdf_to_multipage_image
         
-        for page_num in range(len(pdf_doc)):
-            page = pdf_doc[page_num]
-            # Higher resolution for better quality
-            mat = fitz.Matrix(2.0, 2.0)  # 2x zoom for 144 DPI
-            pix = page.get_pixmap(matrix=mat)
-            
-            img_filename = f"{name}_slide_{page_num + 1}.{target_format}"
-            img_path = os.path.join(output_dir, img_filename)
-            
-            if target_format.lower() in ['jpg', 'jpeg']:
-                pix.save(img_path, output="jpeg", jpg_quality=95)
-            else:
-                pix.save(img_path)
-            
-            output_files.append(img_filename)
+        if multipage:
+            output_filename = f"{name}.{target_format}"
+            result = pdf_to_multipage_image(pdf_path, os.path.join(output_dir, output_filename), output_filename,
+                                            target_format, quality=quality)
+            os.remove(pdf_path)
+            return result
         
-        pdf_doc.close()
+        output_files = render_pdf_pages(pdf_path, output_dir, target_format, f"{name}_slide", quality=quality)
         
         # Clean up temp PDF
         if os.path.exists(pdf_path):
@@ -180,24 +149,114 @@ def _pptx_to_images(input_path: str, output_dir: str, target_format: str, name:
         return {"success": False, "error": f"PDF→resim dönüşüm hatası: {str(e)}"}
 
 
+P_NS = '{http://schemas.openxmlformats.org/presentationml/2006/main}'
+A_NS = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+R_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+NOTES_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/notesSlide'
+
+
 def _pptx_to_txt(input_path: str, output_path: str, output_filename: str) -> dict:
-    """Extract text from PPTX."""
-    try:
-        from pptx import Presentation
-    except ImportError:
-        return {"success": False, "error": "python-pptx yüklü değil. 'pip install python-pptx' çalıştırın."}
-    
-    prs = Presentation(input_path)
-    text_content = []
-    
-    for slide_num, slide in enumerate(prs.slides, 1):
-        text_content.append(f"=== Slayt {slide_num} ===\n")
-        for shape in slide.shapes:
-            if hasattr(shape, "text") and shape.text.strip():
-                text_content.append(shape.text)
-        text_content.append("\n")
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("\n".join(text_content))
-    
+    """Extract slide text, tables and speaker notes from PPTX, slide by slide."""
+    with zipfile.ZipFile(input_path) as pptx, open(output_path, 'w', encoding='utf-8') as f:
+        for slide_num, slide_part in enumerate(_slide_parts(pptx), 1):
+            f.write(f"=== Slayt {slide_num} ===\n\n")
+            texts = _slide_texts(pptx, slide_part)
+            if texts:
+                f.write("\n".join(texts) + "\n")
+
+            notes_part = _related_part(pptx, slide_part, NOTES_REL)
+            if notes_part:
+                notes = _slide_texts(pptx, notes_part, body_only=True)
+                if notes:
+                    f.write("\n--- Notlar ---\n" + "\n".join(notes) + "\n")
+            f.write("\n")
+
     return {"success": True, "output_path": output_path, "filename": output_filename}
+
+
+def _slide_parts(pptx: zipfile.ZipFile) -> list:
+    """Slide part names in presentation order (p:sldIdLst), not file-name order."""
+    from lxml import etree
+
+    presentation = etree.fromstring(pptx.read('ppt/presentation.xml'))
+    rels = _part_rels(pptx, 'ppt/presentation.xml')
+    return [
+        rels[slide_id.get(R_NS + 'id')]
+        for slide_id in presentation.iter(P_NS + 'sldId')
+        if slide_id.get(R_NS + 'id') in rels
+    ]
+
+
+def _part_rels(pptx: zipfile.ZipFile, part: str) -> dict:
+    """rId -> absolute part name for a part's relationships."""
+    from lxml import etree
+
+    folder, filename = posixpath.split(part)
+    rels_name = posixpath.join(folder, '_rels', filename + '.rels')
+    if rels_name not in pptx.namelist():
+        return {}
+    rels = {}
+    for rel in etree.fromstring(pptx.read(rels_name)).iter(REL_NS + 'Relationship'):
+        if rel.get('TargetMode') == 'External':
+            continue
+        target = rel.get('Target')
+        target = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join(folder, target))
+        rels[rel.get('Id')] = target
+        rels.setdefault(rel.get('Type'), target)
+    return rels
+
+
+def _related_part(pptx: zipfile.ZipFile, part: str, rel_type: str):
+    target = _part_rels(pptx, part).get(rel_type)
+    return target if target in pptx.namelist() else None
+
+
+def _slide_texts(pptx: zipfile.ZipFile, part: str, body_only: bool = False) -> list:
+    """
+    Text of each shape and table in document (z-)order, group shapes included.
+    body_only keeps just body placeholders (speaker notes text).
+    """
+    from lxml import etree
+
+    root = etree.fromstring(pptx.read(part))
+    sp_tree = root.find(f'{P_NS}cSld/{P_NS}spTree')
+    texts = []
+    if sp_tree is None:
+        return texts
+
+    def walk(container):
+        for shape in container:
+            if shape.tag == P_NS + 'grpSp':
+                walk(shape)
+            elif shape.tag == P_NS + 'sp':
+                if body_only:
+                    placeholder = shape.find(f'{P_NS}nvSpPr/{P_NS}nvPr/{P_NS}ph')
+                    if placeholder is None or placeholder.get('type') != 'body':
+                        continue
+                text = _text_body(shape.find(P_NS + 'txBody'))
+                if text.strip():
+                    texts.append(text)
+            elif shape.tag == P_NS + 'graphicFrame' and not body_only:
+                for table in shape.iter(A_NS + 'tbl'):
+                    rows = [
+                        "\t".join(_text_body(cell.find(A_NS + 'txBody')).replace("\n", " ")
+                                  for cell in row.iterchildren(A_NS + 'tc'))
+                        for row in table.iterchildren(A_NS + 'tr')
+                    ]
+                    texts.append("\n".join(rows))
+
+    walk(sp_tree)
+    return texts
+
+
+def _text_body(tx_body) -> str:
+    if tx_body is None:
+        return ""
+    paragraphs = []
+    for paragraph in tx_body.iterchildren(A_NS + 'p'):
+        parts = []
+        for node in paragraph.iter(A_NS + 't', A_NS + 'br'):
+            parts.append((node.text or "") if node.tag == A_NS + 't' else "\n")
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs)
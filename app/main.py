@@ -5,25 +5,41 @@ FastAPI backend for file conversion operations.
 from fastapi import FastAPI, File, UploadFile
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse, Response
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 import shutil
 import os
 import time
 import threading
+from urllib.parse import quote
 from .utils import check_ffmpeg, get_output_dir, clean_filename
+from .converters.office import start_office_pool, shutdown_office_pool
 from .converters import (
     convert_image,
+    convert_image_multi,
     convert_media,
     convert_doc,
     convert_pdf,
-    convert_docx,
-    convert_pptx,
-    convert_archive
+    stream_pdf_text,
+    PDF_TEXT_FORMATS,
+    render_pdf_page,
+    PAGE_MEDIA_TYPES,
+    convert_archive,
+    convert_office_batch,
+    convert_planned,
+    has_edge,
+    source_format,
+    clear_plan_cache
 )
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import webbrowser
 
 
+def content_disposition(filename: str) -> str:
+    """Attachment header with an ASCII fallback name and the UTF-8 name (RFC 6266 / RFC 5987)."""
+    fallback = filename.encode('ascii', 'replace').decode('ascii').replace('\\', '_').replace('"', '_')
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
 def get_file_extension(filename: str) -> str:
     """Get file extension, handling double extensions like .tar.gz"""
     filename_lower = filename.lower()
@@ -39,6 +55,25 @@ class ConvertRequest(BaseModel):
     file_path: str
     target_format: str
     quality: str = "high"
+    max_size: int | None = None  # Longest edge in px for image outputs
+    dpi: int | None = None       # Render resolution for vector sources and PDF pages
+    pages: str | None = None     # PDF page ranges, e.g. "1-3,10,20-"
+    multipage: bool = False      # PDF/PPTX pages into one TIFF or animated WebP
+    sheet: str | None = None     # Workbook sheet name or 1-based index; all sheets when omitted
+    record_path: str | None = None  # Repeated JSON/XML records, e.g. "data.items" or "catalog/book"
+
+class BatchConvertRequest(BaseModel):
+    file_paths: list[str]
+    target_format: str = "pdf"
+
+class ImageTarget(BaseModel):
+    format: str
+    max_size: int | None = Field(default=None, gt=0)
+
+class MultiConvertRequest(BaseModel):
+    file_path: str
+    targets: list[ImageTarget]
+    quality: str = "high"
 
 app = FastAPI(title="Universal Converter")
 
@@ -105,7 +140,7 @@ async def upload_file(file: UploadFile = File(...)):
             file_type = "video"
         elif ext in ['.mp3', '.wav', '.flac', '.aac', '.ogg', '.m4a', '.wma', '.aiff', '.opus', '.ac3', '.amr', '.m4r']:
             file_type = "audio"
-        elif ext in ['.csv', '.xlsx', '.xls', '.json', '.xml', '.html', '.txt']:
+        elif ext in ['.csv', '.xlsx', '.xls', '.json', '.jsonl', '.xml', '.html', '.txt', '.parquet', '.feather']:
             file_type = "data"
         elif ext == '.pdf':
             file_type = "pdf"
@@ -129,6 +164,7 @@ async def upload_file(file: UploadFile = File(...)):
 
 @app.on_event("shutdown")
 def remove_temp_files():
+    shutdown_office_pool()
     if os.path.exists(UPLOAD_DIR):
         try:
             shutil.rmtree(UPLOAD_DIR)
@@ -144,6 +180,9 @@ async def startup_event():
         webbrowser.open("http://localhost:1453")
         
     threading.Thread(target=open_browser, daemon=True).start()
+    threading.Thread(target=start_office_pool, daemon=True).start()
+    # Intermediates from a previous run are not indexed any more
+    clear_plan_cache()
     
     def cleanup_old_files():
         while True:
@@ -176,9 +215,19 @@ async def api_convert(request: ConvertRequest):
     result = {"success": False, "error": "Unknown file type"}
 
     try:
+        # Office documents and targets no single converter offers go through the planner,
+        # which shares intermediates (e.g. the office -> PDF render) between requests
+        source = source_format(file_path)
+        if ext in ['.docx', '.doc', '.pptx', '.ppt'] or not has_edge(source, request.target_format):
+            options = {"quality": request.quality, "max_size": request.max_size, "dpi": request.dpi,
+                       "pages": request.pages, "multipage": request.multipage, "sheet": request.sheet,
+                       "record_path": request.record_path}
+            options = {key: value for key, value in options.items() if value not in (None, False, "high")}
+            result = await convert_planned(file_path, output_dir, request.target_format, **options)
         # Image formats
-        if ext in ['.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff', '.tif', '.ico', '.gif', '.heic', '.heif', '.svg', '.avif']:
-            result = await convert_image(file_path, output_dir, request.target_format, request.quality)
+        elif ext in ['.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff', '.tif', '.ico', '.gif', '.heic', '.heif', '.svg', '.avif']:
+            result = await convert_image(file_path, output_dir, request.target_format, request.quality,
+                                         request.max_size, request.dpi)
         # Video formats
         elif ext in ['.mp4', '.mov', '.avi', '.mkv', '.webm', '.flv', '.wmv', '.m4v', '.3gp', '.mpeg', '.mpg', '.ts']:
             result = await convert_media(file_path, output_dir, request.target_format, request.quality)
@@ -186,17 +235,13 @@ async def api_convert(request: ConvertRequest):
         elif ext in ['.mp3', '.wav', '.flac', '.aac', '.ogg', '.m4a', '.wma', '.aiff', '.opus', '.ac3', '.amr', '.m4r']:
             result = await convert_media(file_path, output_dir, request.target_format, request.quality)
         # Data formats
-        elif ext in ['.csv', '.xlsx', '.xls', '.json', '.xml', '.html', '.txt']:
-            result = await convert_doc(file_path, output_dir, request.target_format)
+        elif ext in ['.csv', '.xlsx', '.xls', '.json', '.jsonl', '.xml', '.html', '.txt', '.parquet', '.feather']:
+            result = await convert_doc(file_path, output_dir, request.target_format, request.sheet,
+                                       request.record_path)
         # PDF
         elif ext == '.pdf':
-            result = await convert_pdf(file_path, output_dir, request.target_format)
-        # Word documents
-        elif ext in ['.docx', '.doc']:
-            result = await convert_docx(file_path, output_dir, request.target_format)
-        # PowerPoint
-        elif ext in ['.pptx', '.ppt']:
-            result = await convert_pptx(file_path, output_dir, request.target_format)
+            result = await convert_pdf(file_path, output_dir, request.target_format, request.pages, request.dpi,
+                                       request.quality, request.multipage)
         # Archives
         elif ext in ['.zip', '.7z', '.tar', '.gz', '.tgz', '.bz2', '.tar.gz', '.tar.bz2', '.tar.xz']:
             result = await convert_archive(file_path, output_dir, request.target_format)
@@ -205,6 +250,101 @@ async def api_convert(request: ConvertRequest):
     
     return result
 
+@app.post("/api/convert-multi")
+async def api_convert_multi(request: MultiConvertRequest):
+    """Convert one image to several formats/sizes with a single decode."""
+    file_path = os.path.join(UPLOAD_DIR, request.file_path)
+
+    if not os.path.exists(file_path):
+        return {"success": False, "error": f"File not found: {request.file_path}"}
+
+    ext = get_file_extension(os.path.basename(file_path))
+    if ext not in ['.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tiff', '.tif', '.ico', '.gif', '.heic', '.heif', '.svg', '.avif']:
+        return {"success": False, "error": "Multi-target conversion is only available for images"}
+
+    try:
+        targets = [target.model_dump() for target in request.targets]
+        return await convert_image_multi(file_path, get_output_dir(), targets, request.quality)
+    except Exception as e:
+        return {"success": False, "error": f"Dönüşüm hatası: {str(e)}"}
+
+@app.post("/api/convert-batch")
+async def api_convert_batch(request: BatchConvertRequest):
+    """Convert many DOCX/PPTX files to PDF in batched LibreOffice runs."""
+    if request.target_format != 'pdf':
+        return {"success": False, "error": "Batch conversion only supports PDF output"}
+
+    results = [None] * len(request.file_paths)
+    jobs = []
+    for index, name in enumerate(request.file_paths):
+        file_path = os.path.join(UPLOAD_DIR, os.path.basename(name))
+        if not os.path.exists(file_path):
+            results[index] = {"success": False, "error": f"File not found: {name}"}
+        elif get_file_extension(file_path) not in ['.docx', '.doc', '.pptx', '.ppt']:
+            results[index] = {"success": False, "error": "Only Word and PowerPoint files can be batch converted"}
+        else:
+            jobs.append((index, file_path))
+
+    try:
+        converted = await convert_office_batch([file_path for _, file_path in jobs], get_output_dir())
+    except Exception as e:
+        return {"success": False, "error": f"Dönüşüm hatası: {str(e)}"}
+
+    for (index, _), result in zip(jobs, converted):
+        results[index] = result
+    for name, result in zip(request.file_paths, results):
+        result["file_path"] = name
+
+    return {"success": any(result["success"] for result in results), "results": results}
+
+@app.get("/api/stream/{filename}")
+async def stream_conversion(filename: str, target_format: str, pages: str | None = None):
+    """Convert a PDF to TXT/HTML/MD/RTF while sending it, page by page."""
+    safe_filename = os.path.basename(filename)
+    file_path = os.path.join(UPLOAD_DIR, safe_filename)
+
+    if not os.path.exists(file_path):
+        return JSONResponse(status_code=404, content={"error": "File not found"})
+    if get_file_extension(safe_filename) != '.pdf' or target_format not in PDF_TEXT_FORMATS:
+        return JSONResponse(status_code=400, content={"error": "Streaming is only available for PDF to TXT/HTML/MD/RTF"})
+
+    # Open the PDF and check the page selection before any header is sent
+    try:
+        chunks = stream_pdf_text(file_path, target_format, pages)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    except Exception as e:
+        return JSONResponse(status_code=400, content={"error": f"PDF açılamadı: {str(e)}"})
+
+    output_filename = f"{os.path.splitext(safe_filename)[0]}.{target_format}"
+    return StreamingResponse(
+        chunks,
+        media_type=PDF_TEXT_FORMATS[target_format],
+        headers={"Content-Disposition": content_disposition(output_filename)}
+    )
+
+@app.get("/api/pdf/{filename}/page/{page}")
+async def pdf_page(filename: str, page: int, dpi: int = 144, format: str = "png"):
+    """Render a single PDF page on demand (cached) for previews and paging."""
+    safe_filename = os.path.basename(filename)
+    file_path = os.path.join(UPLOAD_DIR, safe_filename)
+
+    if not os.path.exists(file_path) or get_file_extension(safe_filename) != '.pdf':
+        return JSONResponse(status_code=404, content={"error": "File not found"})
+
+    try:
+        data, page_count = await render_pdf_page(file_path, page, dpi, format.lower())
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": f"Sayfa oluşturulamadı: {str(e)}"})
+
+    return Response(
+        content=data,
+        media_type=PAGE_MEDIA_TYPES[format.lower()],
+        headers={"X-Page-Count": str(page_count), "Cache-Control": "private, max-age=600"}
+    )
+
 @app.get("/api/download/{filename}")
 async def download_file(filename: str):
     """Download converted file."""
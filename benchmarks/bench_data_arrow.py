@@ -0,0 +1,69 @@
+"""
+Benchmark: pandas default engine vs. the Arrow engine for data conversions.
+
+Generates a CSV (default 2M rows of mixed int/float/string/bool columns) and
+times CSV -> Parquet/Feather the pandas way (C parser, NumPy dtypes) against
+_process_data(), which hands delimited text straight to pyarrow's
+multithreaded reader. Output sizes and the time to load each output back
+into pandas are reported next to the CSV baseline.
+
+Usage: python -m benchmarks.bench_data_arrow [rows]
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from app.converters.docs import _process_data
+
+
+def _make_csv(path: str, rows: int):
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        'id': np.arange(rows),
+        'amount': rng.random(rows) * 1000,
+        'city': rng.choice(['Istanbul', 'Ankara', 'Izmir', 'Bursa', 'Antalya'], rows),
+        'customer': [f'customer_{i % 50000}' for i in range(rows)],
+        'paid': rng.random(rows) > 0.5,
+    }).to_csv(path, index=False)
+
+
+def _pandas_convert(src: str, dst: str, target: str):
+    df = pd.read_csv(src, encoding='utf-8')
+    if target == 'parquet':
+        df.to_parquet(dst, index=False)
+    else:
+        df.to_feather(dst)
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'sales.csv')
+        _make_csv(src, rows)
+        print(f"Source: {rows:,} rows ({os.path.getsize(src) / 1e6:.1f} MB CSV), {os.cpu_count()} CPUs")
+        print(f"  {'load CSV (pandas)':<28} {_timed(pd.read_csv, src):7.2f} s")
+
+        readers = {'parquet': pd.read_parquet, 'feather': pd.read_feather}
+        for target in ['parquet', 'feather']:
+            old = os.path.join(tmp, f'old.{target}')
+            out_dir = os.path.join(tmp, target)
+            os.makedirs(out_dir)
+            old_time = _timed(_pandas_convert, src, old, target)
+            new_time = _timed(_process_data, src, out_dir, target)
+            new = os.path.join(out_dir, f'sales.{target}')
+
+            print(f"  {'CSV->' + target + ' (pandas)':<28} {old_time:7.2f} s   {os.path.getsize(old) / 1e6:7.1f} MB")
+            print(f"  {'CSV->' + target + ' (arrow)':<28} {new_time:7.2f} s   {os.path.getsize(new) / 1e6:7.1f} MB")
+            print(f"  {'load ' + target:<28} {_timed(readers[target], new):7.2f} s")
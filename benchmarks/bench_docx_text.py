@@ -0,0 +1,105 @@
+"""
+Benchmark: python-docx object model vs. the streaming lxml DOCX engine.
+
+Builds a long contract-style DOCX (headings, paragraphs, bullet lists and
+a table every few sections) and converts it to HTML twice: with the
+previous python-docx loop (string +=, tables after paragraphs) and with
+_process_docx(). Each run happens in a fresh process so peak RSS is
+comparable.
+
+Usage: python -m benchmarks.bench_docx_text [sections]
+"""
+import os
+import sys
+import time
+import resource
+import tempfile
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PARAGRAPH = "The Supplier shall deliver the Goods in accordance with the Specification and the delivery schedule. " * 4
+
+
+def _make_docx(path: str, sections: int):
+    from docx import Document
+
+    doc = Document()
+    for i in range(sections):
+        doc.add_heading(f"Section {i + 1}", 1)
+        for _ in range(6):
+            doc.add_paragraph(PARAGRAPH)
+        for j in range(3):
+            doc.add_paragraph(f"Obligation {j + 1}", style='List Bullet')
+        if i % 5 == 0:
+            table = doc.add_table(rows=6, cols=4)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = "Value"
+    doc.save(path)
+
+
+def _python_docx_html(input_path: str, output_path: str):
+    from docx import Document
+
+    doc = Document(input_path)
+    html_content = "<html><body>\n"
+    for para in doc.paragraphs:
+        if para.text.strip():
+            style_name = para.style.name if para.style else ""
+            if "Heading 1" in style_name:
+                html_content += f"    <h1>{para.text}</h1>\n"
+            else:
+                html_content += f"    <p>{para.text}</p>\n"
+    for table in doc.tables:
+        html_content += "    <table>\n"
+        for i, row in enumerate(table.rows):
+            html_content += "        <tr>\n"
+            tag = "th" if i == 0 else "td"
+            for cell in row.cells:
+                html_content += f"            <{tag}>{cell.text}</{tag}>\n"
+            html_content += "        </tr>\n"
+        html_content += "    </table>\n"
+    html_content += "</body></html>"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+
+
+def _streaming_html(input_path: str, output_path: str):
+    from app.converters.docx_converter import _process_docx
+    result = _process_docx(input_path, os.path.dirname(output_path), 'html')
+    assert result["success"], result
+
+
+def _run(func, src, out_path, queue):
+    import app.converters.docx_converter  # noqa: F401 - same import baseline for both runs
+    start = time.perf_counter()
+    func(src, out_path)
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def _measure(func, src, out_path):
+    # Linux keeps ru_maxrss across fork/exec, so the parent must stay small
+    ctx = mp.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run, args=(func, src, out_path, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+if __name__ == '__main__':
+    sections = int(sys.argv[1]) if len(sys.argv) > 1 else 1500
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'contract.docx')
+        maker = mp.get_context('spawn').Process(target=_make_docx, args=(src, sections))
+        maker.start()
+        maker.join()
+        print(f"Source: {sections} sections ({os.path.getsize(src) / 1e6:.1f} MB DOCX) -> HTML")
+        for label, func, out_name in [("python-docx (old)", _python_docx_html, 'old/contract.html'),
+                                      ("lxml iterparse", _streaming_html, 'new/contract.html')]:
+            os.makedirs(os.path.join(tmp, os.path.dirname(out_name)))
+            elapsed, rss = _measure(func, src, os.path.join(tmp, out_name))
+            print(f"  {label:<20} {elapsed:6.2f} s   peak RSS {rss:7.1f} MB")
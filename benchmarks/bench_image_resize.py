@@ -0,0 +1,74 @@
+"""
+Benchmark: full-resolution decode vs. reduced decode for image downscaling.
+
+Creates a synthetic ~50 MP JPEG and downscales it to 1920px twice:
+once the old way (full decode, then resize) and once through
+_decode_reduced(), which uses draft()/reduce(). Timings cover decode and
+resize; both results are then saved as WEBP.
+Each run happens in a fresh process so peak RSS is comparable.
+
+Usage: python -m benchmarks.bench_image_resize
+"""
+import os
+import sys
+import time
+import resource
+import tempfile
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+WIDTH, HEIGHT = 8660, 5773  # ~50 MP
+MAX_SIZE = 1920
+
+
+def _make_source(path: str):
+    img = Image.radial_gradient('L').resize((WIDTH, HEIGHT))
+    img = Image.merge('RGB', (img, img.transpose(Image.FLIP_LEFT_RIGHT), img.transpose(Image.FLIP_TOP_BOTTOM)))
+    img.save(path, 'JPEG', quality=90)
+
+
+def _full_decode(src: str):
+    with Image.open(src) as img:
+        img.load()
+        return img.resize((MAX_SIZE, round(MAX_SIZE * HEIGHT / WIDTH)), Image.LANCZOS)
+
+
+def _reduced_decode(src: str):
+    from app.converters.images import _decode_reduced
+    with Image.open(src) as img:
+        return _decode_reduced(img, MAX_SIZE)
+
+
+def _run(func, src, out_dir, queue):
+    import app.converters.images  # noqa: F401 - same import baseline for both runs
+    start = time.perf_counter()
+    resized = func(src)
+    elapsed = time.perf_counter() - start
+    resized.save(os.path.join(out_dir, f'{func.__name__}.webp'), 'WEBP', quality=95)
+    queue.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def _measure(func, src, out_dir):
+    # Linux keeps ru_maxrss across fork/exec, so the parent must stay small
+    ctx = mp.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run, args=(func, src, out_dir, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'photo.jpg')
+        maker = mp.get_context('spawn').Process(target=_make_source, args=(src,))
+        maker.start()
+        maker.join()
+        print(f"Source: {WIDTH}x{HEIGHT} JPEG ({os.path.getsize(src) / 1e6:.1f} MB) -> {MAX_SIZE}px WEBP")
+        for label, func in [("full decode + resize", _full_decode), ("draft/reduce decode", _reduced_decode)]:
+            elapsed, rss = _measure(func, src, tmp)
+            print(f"  {label:<22} {elapsed:6.2f} s   peak RSS {rss:7.1f} MB")
@@ -0,0 +1,53 @@
+"""
+Benchmark: PDF→PNG rasterization scaling over worker processes.
+
+Generates a text-and-vector PDF and renders every page through
+render_pdf_pages() with 1, 2, 4, 8 and 16 workers. Each run writes to a
+fresh directory and the file lists are checked to be identical.
+
+Usage: python -m benchmarks.bench_pdf_render [pages]
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+
+from app.converters.pdf import render_pdf_pages
+
+WORKERS = [1, 2, 4, 8, 16]
+PARAGRAPH = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor. " * 12
+
+
+def _make_pdf(path: str, pages: int):
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {i + 1}", fontsize=22)
+        page.insert_textbox(fitz.Rect(72, 100, 520, 500), PARAGRAPH * 2, fontsize=10)
+        for j in range(40):
+            page.draw_circle((300, 640), 10 + j * 2, color=(j / 40, 0.2, 1 - j / 40))
+    doc.save(path)
+    doc.close()
+
+
+if __name__ == '__main__':
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'report.pdf')
+        _make_pdf(src, pages)
+        print(f"Source: {pages} pages -> PNG at 144 DPI, {os.cpu_count()} CPUs")
+
+        baseline = None
+        for workers in WORKERS:
+            out_dir = os.path.join(tmp, f'w{workers}')
+            os.makedirs(out_dir)
+            start = time.perf_counter()
+            files = render_pdf_pages(src, out_dir, 'png', 'report_page', workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            assert files == [f'report_page_{n}.png' for n in range(1, pages + 1)]
+            print(f"  {workers:>2} workers  {elapsed:7.2f} s   speed-up {baseline / elapsed:5.2f}x")
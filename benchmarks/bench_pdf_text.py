@@ -0,0 +1,63 @@
+"""
+Benchmark: PyPDF2 text extraction vs. the PyMuPDF page-block engine.
+
+Generates a 1000-page PDF (heading + body text per page) and times the
+previous PyPDF2 loop with string concatenation against _process_pdf()
+for each text target.
+
+Usage: python -m benchmarks.bench_pdf_text [pages]
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz
+import PyPDF2
+
+from app.converters.pdf import _process_pdf
+
+PARAGRAPH = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor. " * 12
+
+
+def _make_pdf(path: str, pages: int):
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Chapter {i + 1}", fontsize=22)
+        page.insert_textbox(fitz.Rect(72, 100, 520, 760), PARAGRAPH * 3, fontsize=10)
+    doc.save(path)
+    doc.close()
+
+
+def _pypdf2_txt(input_path: str, output_path: str):
+    text_content = ""
+    with open(input_path, 'rb') as pdf_file:
+        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        for i, page in enumerate(pdf_reader.pages):
+            page_text = page.extract_text()
+            if page_text:
+                text_content += f"--- Page {i+1} ---\n{page_text}\n\n"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(text_content)
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'report.pdf')
+        _make_pdf(src, pages)
+        print(f"Source: {pages} pages ({os.path.getsize(src) / 1e6:.1f} MB)")
+
+        print(f"  {'PyPDF2 txt (old)':<20} {_timed(_pypdf2_txt, src, os.path.join(tmp, 'old.txt')):7.2f} s")
+        for target in ['txt', 'html', 'md', 'rtf']:
+            elapsed = _timed(_process_pdf, src, tmp, target)
+            print(f"  {'PyMuPDF ' + target:<20} {elapsed:7.2f} s")
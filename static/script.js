@@ -472,10 +472,10 @@ function getFormatOptions(type) {
         image: ['webp', 'png', 'jpg', 'gif', 'bmp', 'tiff', 'ico', 'pdf'],
         video: ['mp4', 'webm', 'avi', 'mkv', 'mov', 'gif', 'mp3', 'wav'],
         audio: ['mp3', 'wav', 'aac', 'ogg', 'flac', 'm4a'],
-        data: ['csv', 'xlsx', 'json', 'xml', 'html', 'txt'],
-        pdf: ['docx', 'txt', 'html', 'md', 'png', 'jpg'],
-        docx: ['pdf', 'txt', 'html', 'md'],
-        pptx: ['pdf', 'png', 'jpg', 'txt'],
+        data: ['csv', 'xlsx', 'json', 'jsonl', 'xml', 'html', 'txt', 'parquet', 'feather'],
+        pdf: ['docx', 'txt', 'html', 'md', 'png', 'jpg', 'webp', 'tiff', 'pdf'],
+        docx: ['pdf', 'txt', 'html', 'md', 'png', 'jpg', 'webp'],
+        pptx: ['pdf', 'png', 'jpg', 'webp', 'tiff', 'txt'],
         archive: ['zip', '7z', 'tar']
     };
 
@@ -0,0 +1,27 @@
+import pytest
+
+from app.converters import docs
+
+CSV = (
+    "id,name,price,day,active,note\n"
+    "1,Çay,12.5,2024-01-05,true,\n"
+    "2,\"Kahve, sade\",30,2024-02-10,false,x\n"
+    "3,Su,,2024-03-15,true,\n"
+)
+
+
+@pytest.mark.parametrize("target_format", ["csv", "txt", "json", "jsonl", "xml"])
+def test_output_does_not_depend_on_stream_threshold(tmp_path, monkeypatch, target_format):
+    source = tmp_path / "prices.csv"
+    source.write_text(CSV, encoding="utf-8")
+
+    outputs = []
+    for threshold in [float("inf"), 0]:
+        monkeypatch.setattr(docs, "STREAM_THRESHOLD", threshold)
+        output_dir = tmp_path / f"out_{len(outputs)}"
+        output_dir.mkdir()
+        result = docs._process_data(str(source), str(output_dir), target_format)
+        assert result["success"], result
+        outputs.append((output_dir / result["filename"]).read_bytes())
+
+    assert outputs[0] == outputs[1]
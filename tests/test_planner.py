@@ -0,0 +1,52 @@
+import fitz
+
+from app.converters import planner
+
+
+def _write_pdf(path, pages):
+    doc = fitz.open()
+    for _ in range(pages):
+        doc.new_page(width=200, height=100)
+    doc.save(path)
+    doc.close()
+
+
+def test_pptx_images_through_pdf_keep_slide_names(tmp_path, monkeypatch):
+    monkeypatch.setattr(planner, "PLAN_CACHE_DIR", str(tmp_path / "cache"))
+    planner.clear_plan_cache()
+
+    # The office step needs LibreOffice; seed its PDF result as a cached intermediate instead
+    source = tmp_path / "deck.pptx"
+    source.write_bytes(b"not really a presentation")
+    pdf_path = tmp_path / "deck.pdf"
+    _write_pdf(str(pdf_path), 2)
+    planner._store_artifact(planner._content_hash(str(source)), "pdf", str(pdf_path))
+
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    try:
+        result = planner._convert_planned(str(source), str(output_dir), "png", {})
+    finally:
+        planner.clear_plan_cache()
+
+    assert result["success"], result
+    assert result["all_files"] == ["deck_slide_1.png", "deck_slide_2.png"]
+    assert result["note"].startswith("2 slayt resmi")
+    assert sorted(p.name for p in output_dir.iterdir()) == ["deck_slide_1.png", "deck_slide_2.png"]
+
+
+def test_pdf_images_keep_page_names(tmp_path, monkeypatch):
+    monkeypatch.setattr(planner, "PLAN_CACHE_DIR", str(tmp_path / "cache"))
+    source = tmp_path / "report.pdf"
+    _write_pdf(str(source), 2)
+
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    try:
+        result = planner._convert_planned(str(source), str(output_dir), "png", {})
+    finally:
+        planner.clear_plan_cache()
+
+    assert result["success"], result
+    assert result["all_files"] == ["report_page_1.png", "report_page_2.png"]
+    assert result["note"] == "2 sayfa resmi oluşturuldu"